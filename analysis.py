@@ -6,7 +6,29 @@ import numpy as np
 import streamlit as st
 from datetime import datetime, timedelta
 from typing import Dict, List, Tuple, Optional, Union
-from modules.inflation import get_inflation_rate
+from modules.inflation import get_inflation_rates
+from modules.data_utils import filter_date_range
+from modules.kernels import rebalance_kernel, risk_kernel
+
+# Częstotliwości rebalancingu jako aliasy dat pandas
+REBALANCE_FREQUENCIES = {
+    'monthly': 'MS',    # Początek miesiąca
+    'quarterly': 'QS',  # Początek kwartału
+    'yearly': 'YS'      # Początek roku
+}
+
+def _final_value(portfolio: pd.DataFrame) -> float:
+    """
+    Zwraca końcową wartość portfela (suma Ilość * Cena jednostkowa).
+
+    Liczona jednym iloczynem skalarnym na tablicach NumPy, bez kolumny pośredniej.
+    """
+    return float(np.dot(portfolio['Ilość'].to_numpy(dtype=float), portfolio['Cena jednostkowa'].to_numpy(dtype=float)))
+
+def _years_between(start_date: datetime, end_date: datetime) -> float:
+    """Zwraca liczbę lat między datami (pełne dni / 365.25) liczoną na np.datetime64."""
+    days = (np.datetime64(end_date, 'D') - np.datetime64(start_date, 'D')).astype('int64')
+    return int(days) / 365.25
 
 def calculate_roi(
     portfolio: pd.DataFrame,
@@ -28,7 +50,7 @@ def calculate_roi(
         return 0.0, 0.0, 0.0
     
     # Obliczamy końcową wartość portfela
-    portfolio_value = (portfolio['Ilość'] * portfolio['Cena jednostkowa']).sum()
+    portfolio_value = _final_value(portfolio)
     
     # Obliczamy zysk/stratę
     profit_loss = portfolio_value - initial_investment
@@ -67,13 +89,13 @@ def calculate_annualized_return(
     start_date = schedule['Data'].min()
     
     # Obliczamy końcową wartość portfela
-    portfolio_value = (portfolio['Ilość'] * portfolio['Cena jednostkowa']).sum()
+    portfolio_value = _final_value(portfolio)
     
     # Całkowita zainwestowana kwota
     total_investment = schedule['Kwota'].sum()
     
     # Obliczamy okres inwestycji w latach
-    years = (end_date - start_date).days / 365.25
+    years = _years_between(start_date, end_date)
     
     # Obliczamy annualizowaną stopę zwrotu (CAGR)
     if years > 0 and total_investment > 0:
@@ -103,13 +125,9 @@ def calculate_real_return(
     Returns:
         Realna stopa zwrotu (%).
     """
-    # Obliczamy średnią inflację w okresie
-    years = list(range(start_year, end_year + 1))
-    total_inflation = 1.0
-    
-    for year in years:
-        inflation_rate = get_inflation_rate(inflation_rates, year, currency)
-        total_inflation *= (1 + inflation_rate / 100)
+    # Obliczamy skumulowaną inflację w okresie (jedno mnożenie po wektorze lat)
+    rates = get_inflation_rates(inflation_rates, start_year, end_year, currency)
+    total_inflation = float(np.prod(1 + rates / 100))
     
     # Obliczamy realną stopę zwrotu
     real_return = ((1 + nominal_return / 100) / total_inflation - 1) * 100
@@ -142,10 +160,7 @@ def calculate_risk_metrics(
         }
     
     # Filtrujemy ceny w zakresie dat
-    filtered_prices = metal_prices[
-        (metal_prices['Data'] >= start_date) & 
-        (metal_prices['Data'] <= end_date)
-    ]
+    filtered_prices = filter_date_range(metal_prices, start_date, end_date)
     
     if filtered_prices.empty:
         return {
@@ -154,53 +169,36 @@ def calculate_risk_metrics(
             'sharpe_ratio': 0.0
         }
     
-    # Tworzymy DataFrame z wartością portfela w czasie
-    portfolio_value = []
+    metals = ['Gold', 'Silver', 'Platinum', 'Palladium']
     
-    for date in filtered_prices['Data'].unique():
-        # Pobieramy ceny na daną datę
-        prices_on_date = filtered_prices[filtered_prices['Data'] == date].iloc[0]
-        
-        # Obliczamy wartość portfela dla każdego metalu
-        value = 0.0
-        
-        for metal in ['Gold', 'Silver', 'Platinum', 'Palladium']:
-            metal_holdings = portfolio[portfolio['Metal'] == metal.capitalize()]
-            if not metal_holdings.empty:
-                metal_quantity = metal_holdings['Ilość'].sum()
-                metal_price = prices_on_date.get(metal, 0)
-                value += metal_quantity * metal_price
-        
-        portfolio_value.append({
-            'Data': date,
-            'Wartość': value
-        })
+    # Wektor ilości posiadanych metali (jedno grupowanie zamiast filtrowania per data)
+    holdings = portfolio.groupby('Metal', observed=True)['Ilość'].sum().reindex(metals, fill_value=0).to_numpy(dtype=float)
+    
+    # Macierz cen (daty x metale); brakujące kolumny metali traktujemy jako cenę 0
+    prices_by_date = filtered_prices.drop_duplicates('Data')
+    prices_matrix = prices_by_date.reindex(columns=metals, fill_value=0).to_numpy(dtype=float)
     
-    # Tworzymy DataFrame
-    df_value = pd.DataFrame(portfolio_value)
+    # Wartość portfela w czasie jako jedno mnożenie macierz-wektor; bierzemy tylko posiadane
+    # metale, żeby brak ceny (NaN) metalu spoza portfela nie psuł wartości z danego dnia
+    held = holdings != 0
+    values = prices_matrix[:, held] @ holdings[held]
     
-    if df_value.empty or len(df_value) < 2:
+    if len(values) < 2:
         return {
             'volatility': 0.0,
             'max_drawdown': 0.0,
             'sharpe_ratio': 0.0
         }
     
-    # Obliczamy dzienne stopy zwrotu
-    df_value['Return'] = df_value['Wartość'].pct_change()
+    returns_std, max_drawdown, mean_return = risk_kernel(np.ascontiguousarray(values))
     
     # Obliczamy zmienność (odchylenie standardowe dziennych stóp zwrotu, annualizowane)
-    volatility = df_value['Return'].std() * np.sqrt(252) * 100  # w procentach
-    
-    # Obliczamy maksymalny drawdown
-    df_value['Cummax'] = df_value['Wartość'].cummax()
-    df_value['Drawdown'] = (df_value['Wartość'] - df_value['Cummax']) / df_value['Cummax'] * 100
-    max_drawdown = abs(df_value['Drawdown'].min())
+    volatility = returns_std * np.sqrt(252) * 100  # w procentach
     
     # Obliczamy Sharpe ratio (przyjmujemy wolną od ryzyka stopę zwrotu na poziomie 1%)
     risk_free_rate = 0.01  # 1% rocznie
-    mean_return = df_value['Return'].mean() * 252  # Annualizowana średnia stopa zwrotu
-    sharpe_ratio = (mean_return - risk_free_rate) / (df_value['Return'].std() * np.sqrt(252)) if df_value['Return'].std() > 0 else 0
+    mean_return = mean_return * 252  # Annualizowana średnia stopa zwrotu
+    sharpe_ratio = (mean_return - risk_free_rate) / (returns_std * np.sqrt(252)) if returns_std > 0 else 0
     
     return {
         'volatility': volatility,
@@ -233,18 +231,18 @@ def compare_investment_strategies(
     
     comparison_results = []
     
+    # Okres inwestycji w latach jest wspólny dla wszystkich strategii
+    years = _years_between(start_date, end_date)
+    
     for strategy_name, portfolio_df in portfolio_data.items():
         if portfolio_df.empty:
             continue
         
         # Obliczamy podstawowe metryki
-        final_value = (portfolio_df['Ilość'] * portfolio_df['Cena jednostkowa']).sum()
+        final_value = _final_value(portfolio_df)
         profit_loss = final_value - investment_amount
         roi = (profit_loss / investment_amount) * 100 if investment_amount > 0 else 0
         
-        # Obliczamy okres inwestycji w latach
-        years = (end_date - start_date).days / 365.25
-        
         # Obliczamy annualizowaną stopę zwrotu
         cagr = ((final_value / investment_amount) ** (1 / years) - 1) * 100 if years > 0 else 0
         
@@ -294,73 +292,67 @@ def simulate_rebalancing(
     if end_date is None:
         end_date = portfolio['Data'].max()
     
-    # Określamy częstotliwość rebalancingu
-    if rebalance_frequency == 'monthly':
-        freq = 'MS'  # Początek miesiąca
-    elif rebalance_frequency == 'quarterly':
-        freq = 'QS'  # Początek kwartału
-    elif rebalance_frequency == 'yearly':
-        freq = 'YS'  # Początek roku
-    else:
-        freq = 'QS'  # Domyślnie kwartalnie
+    # Określamy częstotliwość rebalancingu (domyślnie kwartalnie)
+    freq = REBALANCE_FREQUENCIES.get(rebalance_frequency, 'QS')
     
     # Generujemy daty rebalancingu
     rebalance_dates = pd.date_range(start=start_date, end=end_date, freq=freq)
     
-    # Funkcja do rebalancingu na daną datę
-    def rebalance_on_date(date, portfolio_df):
-        # Filtrujemy ceny na daną datę
-        prices_on_date = metal_prices[metal_prices['Data'] >= date].iloc[0]
-        
-        # Obliczamy całkowitą wartość portfela
-        total_value = 0
-        metals_value = {}
-        
-        for metal in ['Gold', 'Silver', 'Platinum', 'Palladium']:
-            metal_holdings = portfolio_df[portfolio_df['Metal'] == metal.capitalize()]
-            if not metal_holdings.empty:
-                metal_quantity = metal_holdings['Ilość'].sum()
-                metal_price = prices_on_date.get(metal, 0)
-                metal_value = metal_quantity * metal_price
-                metals_value[metal.lower()] = metal_value
-                total_value += metal_value
-        
-        # Obliczamy docelową wartość dla każdego metalu
-        target_values = {}
-        for metal, alloc in target_allocation.items():
-            target_values[metal] = total_value * (alloc / 100)
-        
-        # Obliczamy różnicę między obecną a docelową wartością
-        rebalance_actions = []
-        
-        for metal, target_value in target_values.items():
-            current_value = metals_value.get(metal, 0)
-            diff_value = target_value - current_value
-            
-            if abs(diff_value) > 1:  # Ignorujemy małe różnice
-                metal_price = prices_on_date.get(metal.capitalize(), 0)
-                if metal_price > 0:
-                    diff_quantity = diff_value / metal_price
-                    
-                    rebalance_actions.append({
-                        'Data': date,
-                        'Typ operacji': 'Zakup' if diff_value > 0 else 'Sprzedaż',
-                        'Metal': metal.capitalize(),
-                        'Ilość': abs(diff_quantity),
-                        'Cena jednostkowa': metal_price,
-                        'Kwota operacji': abs(diff_value),
-                        'Koszt magazynowania': 0.0,
-                        'Sprzedaż na koszty': 0.0
-                    })
-        
-        # Dodajemy akcje rebalancingu do portfela
-        return pd.concat([portfolio_df, pd.DataFrame(rebalance_actions)], ignore_index=True)
-    
-    # Wykonujemy rebalancing na każdą datę
-    for rebalance_date in rebalance_dates:
-        rebalanced_portfolio = rebalance_on_date(rebalance_date, rebalanced_portfolio)
+    if len(rebalance_dates) == 0:
+        return rebalanced_portfolio
+    
+    # Ceny na wszystkie daty rebalancingu naraz (pierwsze notowanie w danym dniu lub później)
+    sorted_prices = metal_prices
+    if not sorted_prices['Data'].is_monotonic_increasing:
+        sorted_prices = sorted_prices.sort_values('Data')
+    dates_df = pd.DataFrame({'Data': rebalance_dates.astype(sorted_prices['Data'].dtype)})
+    priced = pd.merge_asof(dates_df, sorted_prices, on='Data', direction='forward')
+    
+    # Pomijamy daty, po których nie ma już żadnych notowań
+    priced = priced[priced.drop(columns='Data').notna().any(axis=1)]
+    
+    metals = ['Gold', 'Silver', 'Platinum', 'Palladium']
+    target_metals = [metal.capitalize() for metal in target_allocation]
+    target_names = np.array(target_metals, dtype=object)
+    target_weights = np.array(list(target_allocation.values()), dtype=float) / 100
+    # Pozycja metalu docelowego w wektorze posiadanych metali (-1 = metal spoza listy)
+    target_idx = np.array([metals.index(m) if m in metals else -1 for m in target_metals], dtype=int)
+    
+    value_prices = priced.reindex(columns=metals, fill_value=0).to_numpy(dtype=float)
+    target_prices = priced.reindex(columns=target_metals, fill_value=0).to_numpy(dtype=float)
+    
+    # Stan posiadania metali (sprzedaże zmniejszają ilość)
+    sign = np.where(portfolio['Typ operacji'] == 'Sprzedaż', -1.0, 1.0) if 'Typ operacji' in portfolio.columns else 1.0
+    holdings = (portfolio['Ilość'] * sign).groupby(portfolio['Metal'], observed=True).sum().reindex(metals, fill_value=0).to_numpy(dtype=float)
+    
+    diff_values, mask = rebalance_kernel(
+        holdings,
+        np.ascontiguousarray(value_prices),
+        np.ascontiguousarray(target_prices),
+        target_weights,
+        target_idx
+    )
+    
+    if not mask.any():
+        return rebalanced_portfolio
+    
+    # Operacje w kolejności: daty, a w ramach daty metale docelowe
+    selected = mask.ravel()
+    diff_values = diff_values.ravel()[selected]
+    unit_prices = target_prices.ravel()[selected]
+    rebalance_actions = pd.DataFrame({
+        'Data': np.repeat(priced['Data'].to_numpy(), len(target_metals))[selected],
+        'Typ operacji': np.where(diff_values > 0, 'Zakup', 'Sprzedaż'),
+        'Metal': np.tile(target_names, len(priced))[selected],
+        'Ilość': np.abs(diff_values / unit_prices),
+        'Cena jednostkowa': unit_prices,
+        'Kwota operacji': np.abs(diff_values),
+        'Koszt magazynowania': 0.0,
+        'Sprzedaż na koszty': 0.0
+    })
     
-    return rebalanced_portfolio
+    # Dodajemy akcje rebalancingu do portfela jednym połączeniem
+    return pd.concat([rebalanced_portfolio, rebalance_actions], ignore_index=True)
 
 def compare_with_other_assets(
     metal_prices: pd.DataFrame,
@@ -383,84 +375,54 @@ def compare_with_other_assets(
         DataFrame z porównaniem zwrotów.
     """
     # Filtrujemy dane metali w zakresie dat
-    filtered_metals = metal_prices[
-        (metal_prices['Data'] >= start_date) & 
-        (metal_prices['Data'] <= end_date)
-    ].copy()
+    filtered_metals = filter_date_range(metal_prices, start_date, end_date)
     
     if filtered_metals.empty:
         return pd.DataFrame()
     
-    # Obliczamy indeksy dla metali (bazując na wartości początkowej = initial_investment)
-    comparison_data = []
-    
-    # Przygotowanie danych dla metali
-    for metal in ['Gold', 'Silver', 'Platinum', 'Palladium']:
-        if metal in filtered_metals.columns:
-            base_price = filtered_metals[metal].iloc[0]
-            if base_price > 0:
-                last_price = filtered_metals[metal].iloc[-1]
-                roi = (last_price / base_price - 1) * 100
-                years = (end_date - start_date).days / 365.25
-                
-                # Annualizowana stopa zwrotu
-                if years > 0:
-                    cagr = ((last_price / base_price) ** (1 / years) - 1) * 100
-                else:
-                    cagr = 0
-                
-                comparison_data.append({
-                    'Aktywo': f"{metal}",
-                    'Zwrot całkowity (%)': roi,
-                    'Roczna stopa zwrotu (%)': cagr,
-                    'Wartość końcowa': initial_investment * (1 + roi/100)
-                })
-    
-    # Dodajemy przykładowe klasy aktywów (benchmarki)
-    # W rzeczywistej aplikacji te dane powinny być pobierane z API lub plików CSV
-    
-    # Przykład: Indeks giełdowy (symulowany)
-    stock_index_roi = 65.0  # Przykładowy zwrot dla symulacji
-    stock_index_cagr = ((1 + stock_index_roi/100) ** (1 / years) - 1) * 100 if years > 0 else 0
+    years = _years_between(start_date, end_date)
     
-    comparison_data.append({
-        'Aktywo': 'Indeks S&P 500',
-        'Zwrot całkowity (%)': stock_index_roi,
-        'Roczna stopa zwrotu (%)': stock_index_cagr,
-        'Wartość końcowa': initial_investment * (1 + stock_index_roi/100)
-    })
-    
-    # Przykład: Obligacje (symulowany)
-    bonds_roi = 15.0  # Przykładowy zwrot dla symulacji
-    bonds_cagr = ((1 + bonds_roi/100) ** (1 / years) - 1) * 100 if years > 0 else 0
+    # Obliczamy indeksy dla metali (bazując na wartości początkowej = initial_investment)
+    # Ceny wszystkich metali wyciągamy jedną macierzą i liczymy zwroty wektorowo
+    metals_cols = [m for m in ['Gold', 'Silver', 'Platinum', 'Palladium'] if m in filtered_metals.columns]
+    prices = filtered_metals[metals_cols].to_numpy(dtype=float)
+    base_prices = prices[0]
+    last_prices = prices[-1]
+    
+    # Pomijamy metale bez dodatniej ceny początkowej
+    valid = base_prices > 0
+    price_ratio = last_prices[valid] / base_prices[valid]
+    rois = (price_ratio - 1) * 100
+    
+    # Annualizowana stopa zwrotu
+    if years > 0:
+        cagrs = (price_ratio ** (1 / years) - 1) * 100
+    else:
+        cagrs = np.zeros_like(rois)
     
-    comparison_data.append({
-        'Aktywo': 'Obligacje 10-letnie',
-        'Zwrot całkowity (%)': bonds_roi,
-        'Roczna stopa zwrotu (%)': bonds_cagr,
-        'Wartość końcowa': initial_investment * (1 + bonds_roi/100)
+    metals_df = pd.DataFrame({
+        'Aktywo': np.array(metals_cols, dtype=object)[valid],
+        'Zwrot całkowity (%)': rois,
+        'Roczna stopa zwrotu (%)': cagrs,
+        'Wartość końcowa': initial_investment * (1 + rois/100)
     })
     
-    # Przykład: Nieruchomości (symulowany)
-    real_estate_roi = 45.0  # Przykładowy zwrot dla symulacji
-    real_estate_cagr = ((1 + real_estate_roi/100) ** (1 / years) - 1) * 100 if years > 0 else 0
-    
-    comparison_data.append({
-        'Aktywo': 'Nieruchomości',
-        'Zwrot całkowity (%)': real_estate_roi,
-        'Roczna stopa zwrotu (%)': real_estate_cagr,
-        'Wartość końcowa': initial_investment * (1 + real_estate_roi/100)
-    })
+    # Dodajemy przykładowe klasy aktywów (benchmarki)
+    # W rzeczywistej aplikacji te dane powinny być pobierane z API lub plików CSV
+    # Zwroty są symulowane; gotówka uwzględnia inflację
+    benchmark_names = ['Indeks S&P 500', 'Obligacje 10-letnie', 'Nieruchomości', 'Gotówka (po inflacji)']
+    benchmark_rois = np.array([65.0, 15.0, 45.0, -15.0])
     
-    # Przykład: Gotówka (uwzględniająca inflację)
-    inflation_roi = -15.0  # Przykładowy zwrot po uwzględnieniu inflacji
-    inflation_cagr = ((1 + inflation_roi/100) ** (1 / years) - 1) * 100 if years > 0 else 0
+    if years > 0:
+        benchmark_cagrs = ((1 + benchmark_rois/100) ** (1 / years) - 1) * 100
+    else:
+        benchmark_cagrs = np.zeros_like(benchmark_rois)
     
-    comparison_data.append({
-        'Aktywo': 'Gotówka (po inflacji)',
-        'Zwrot całkowity (%)': inflation_roi,
-        'Roczna stopa zwrotu (%)': inflation_cagr,
-        'Wartość końcowa': initial_investment * (1 + inflation_roi/100)
+    benchmarks_df = pd.DataFrame({
+        'Aktywo': benchmark_names,
+        'Zwrot całkowity (%)': benchmark_rois,
+        'Roczna stopa zwrotu (%)': benchmark_cagrs,
+        'Wartość końcowa': initial_investment * (1 + benchmark_rois/100)
     })
     
-    return pd.DataFrame(comparison_data)
+    return pd.concat([metals_df, benchmarks_df], ignore_index=True)
@@ -1,35 +1,75 @@
 # /main/charts.py
 
-import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
 import streamlit as st
+from typing import Optional
 
-def plot_portfolio_value(df_portfolio: pd.DataFrame):
+def plot_values(series: pd.Series) -> np.ndarray:
+    """
+    Przygotowuje wartości osi Y dla śladów Plotly.
+
+    Plotly (od wersji 6) przesyła tablice NumPy jako binarne bufory base64, więc
+    float32 - w pełni wystarczający do wykresu - to o połowę mniej danych niż float64.
+
+    Args:
+        series: Seria wartości do narysowania.
+
+    Returns:
+        Tablica float32.
+    """
+    return series.to_numpy(dtype=np.float32)
+
+def portfolio_value_by_date(
+    df_portfolio: pd.DataFrame,
+    value_col: Optional[str] = None,
+    cumulative: bool = False
+) -> pd.Series:
+    """
+    Sumuje wartość depozytu dla każdej daty.
+
+    Args:
+        df_portfolio: DataFrame z historią inwestycji.
+        value_col: Kolumna z wartością; gdy brak, liczona jako Ilość * Cena jednostkowa.
+        cumulative: Czy zwrócić sumę narastającą.
+
+    Returns:
+        Seria wartości indeksowana datą (rosnąco).
+    """
+    if value_col is not None and value_col in df_portfolio.columns:
+        values = df_portfolio[value_col].to_numpy(dtype=float)
+    else:
+        # Wartość depozytu: ilość * aktualna cena metalu (bez dopisywania kolumny do portfela)
+        values = df_portfolio['Ilość'].to_numpy(dtype=float) * df_portfolio['Cena jednostkowa'].to_numpy(dtype=float)
+
+    # Kody dat (posortowanych rosnąco) i suma wag per kod w jednym przebiegu bincount;
+    # jak w groupby pomijamy puste daty i traktujemy brakujące wartości jako 0
+    codes, dates = pd.factorize(df_portfolio['Data'], sort=True)
+    valid = codes >= 0
+    totals = np.bincount(codes[valid], weights=np.where(np.isnan(values), 0.0, values)[valid], minlength=len(dates))
+    by_date = pd.Series(totals, index=pd.Index(dates, name='Data'))
+
+    if cumulative:
+        by_date = by_date.cumsum()
+
+    return by_date.rename(value_col or 'Wartość')
+
+def plot_portfolio_value(
+    df_portfolio: pd.DataFrame,
+    value_col: str = 'Wartość depozytu',
+    cumulative: bool = False
+):
     """
     Rysuje wykres rzeczywistej wartości depozytu w czasie.
 
     Args:
         df_portfolio: DataFrame z historią inwestycji.
+        value_col: Kolumna z wartością sumowaną dla każdej daty.
+        cumulative: Czy rysować sumę narastającą.
     """
     if df_portfolio.empty:
         st.warning("Brak danych do wyświetlenia wykresu.")
         return
 
-    # Obliczamy wartość depozytu: ilość * aktualna cena metalu
-    df_portfolio['Wartość depozytu'] = df_portfolio['Ilość'] * df_portfolio['Cena jednostkowa']
-
-    # Grupujemy po dacie i sumujemy wartość depozytu
-    df_by_date = df_portfolio.groupby('Data').agg({
-        'Wartość depozytu': 'sum'
-    }).reset_index()
-
-    # Rysujemy wykres wartości depozytu
-    fig, ax = plt.subplots(figsize=(10, 6))
-    ax.plot(df_by_date['Data'], df_by_date['Wartość depozytu'], marker='o')
-    ax.set_title("Wartość depozytu w czasie")
-    ax.set_xlabel("Data")
-    ax.set_ylabel("Wartość depozytu")
-    ax.grid(True)
-    fig.autofmt_xdate()
-
-    st.pyplot(fig)
+    # Wykres renderowany po stronie przeglądarki (bez rysowania obrazu na serwerze)
+    st.line_chart(portfolio_value_by_date(df_portfolio, value_col, cumulative))
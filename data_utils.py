@@ -0,0 +1,27 @@
+# /modules/data_utils.py
+# Pomocnicze operacje na danych (bez zależności od warstwy wykresów)
+
+import pandas as pd
+from datetime import datetime
+
+def filter_date_range(df: pd.DataFrame, start_date: datetime, end_date: datetime) -> pd.DataFrame:
+    """
+    Zwraca wiersze z datą (kolumna `Data`) w przedziale [start_date, end_date].
+
+    Dla danych posortowanych po dacie (tak zwracają je loadery) granice są
+    wyszukiwane binarnie i wynik jest wycinkiem zamiast pełnej maski.
+
+    Args:
+        df: DataFrame z kolumną `Data`.
+        start_date: Początek zakresu (włącznie).
+        end_date: Koniec zakresu (włącznie).
+
+    Returns:
+        Wiersze z zakresu dat.
+    """
+    dates = df['Data']
+    if dates.is_monotonic_increasing:
+        start = dates.searchsorted(pd.Timestamp(start_date), side='left')
+        end = dates.searchsorted(pd.Timestamp(end_date), side='right')
+        return df.iloc[start:end]
+    return df[(dates >= start_date) & (dates <= end_date)]
@@ -1,5 +1,8 @@
 # /prometalle_app/app/core/inflation.py
 
+from typing import Dict, Tuple
+
+import numpy as np
 import pandas as pd
 from app.core.config import DEFAULT_INFLATION
 
@@ -10,7 +13,12 @@ def load_inflation_rates(file_path: str) -> pd.DataFrame:
     Jeśli plik nie istnieje lub jest błędny, zwraca domyślne wartości inflacji.
     """
     try:
-        df = pd.read_csv(file_path)
+        df = pd.read_csv(
+            file_path,
+            engine='c',
+            usecols=['Rok', 'waluta', 'roczna_inflacja'],
+            dtype={'Rok': 'int64', 'waluta': 'category', 'roczna_inflacja': 'float64'}
+        )
         if {'Rok', 'waluta', 'roczna_inflacja'}.issubset(df.columns):
             return df
         else:
@@ -18,23 +26,46 @@ def load_inflation_rates(file_path: str) -> pd.DataFrame:
     except Exception as e:
         print(f"Błąd podczas ładowania pliku inflacji: {e}")
         # Zwróć domyślne inflacje w prostym DataFrame
-        data = []
-        for year in range(1997, 2030):
-            for currency, rate in DEFAULT_INFLATION.items():
-                data.append({'Rok': year, 'waluta': currency, 'roczna_inflacja': rate})
-        return pd.DataFrame(data)
+        # Kolumny budujemy od razu jako tablice (lata x waluty), bez listy słowników
+        years = np.arange(1997, 2030)
+        currencies = list(DEFAULT_INFLATION)
+        return pd.DataFrame({
+            'Rok': np.repeat(years, len(currencies)),
+            'waluta': np.tile(currencies, len(years)),
+            'roczna_inflacja': np.tile(list(DEFAULT_INFLATION.values()), len(years))
+        })
+
+# Funkcja do zamiany tabeli inflacji na słownik (wywoływana raz po wczytaniu)
+def build_inflation_lookup(df_inflation: pd.DataFrame) -> Dict[Tuple[int, str], float]:
+    """
+    Buduje słownik {(rok, waluta): inflacja} z tabeli zwróconej przez load_inflation_rates.
+    Przy powtórzonych parach (rok, waluta) pierwszy wpis wygrywa.
+    """
+    first = df_inflation.drop_duplicates(['Rok', 'waluta'])
+    keys = zip(first['Rok'].tolist(), first['waluta'].astype(str).tolist())
+    return dict(zip(keys, first['roczna_inflacja'].astype(float).tolist()))
 
 # Funkcja do pobrania inflacji dla konkretnego roku i waluty
-def get_inflation_rate(df_inflation: pd.DataFrame, year: int, currency: str) -> float:
+def get_inflation_rate(inflation_lookup: Dict[Tuple[int, str], float], year: int, currency: str) -> float:
     """
-    Zwraca roczną inflację dla podanego roku i waluty.
+    Zwraca roczną inflację dla podanego roku i waluty ze słownika z build_inflation_lookup.
     Jeśli brak danych dla danego roku, zwraca domyślną wartość dla waluty.
     """
     try:
-        rate = df_inflation[(df_inflation['Rok'] == year) & (df_inflation['waluta'] == currency)]['roczna_inflacja'].values
-        if len(rate) > 0:
-            return float(rate[0])
-        else:
-            return DEFAULT_INFLATION.get(currency, 0.02)
+        return inflation_lookup[(year, currency)]
     except:
         return DEFAULT_INFLATION.get(currency, 0.02)
+
+# Funkcja do pobrania inflacji dla kolejnych lat z zakresu
+def get_inflation_rates(df_inflation: pd.DataFrame, start_year: int, end_year: int, currency: str) -> np.ndarray:
+    """
+    Zwraca tablicę rocznych inflacji dla lat start_year..end_year i podanej waluty.
+    Lata bez danych dostają domyślną wartość dla waluty (jak w get_inflation_rate).
+    """
+    default = DEFAULT_INFLATION.get(currency, 0.02)
+    try:
+        rows = df_inflation[(df_inflation['waluta'] == currency) & df_inflation['Rok'].between(start_year, end_year)]
+        rates = rows.drop_duplicates('Rok').set_index('Rok')['roczna_inflacja']  # Pierwszy wpis wygrywa
+        return rates.reindex(range(start_year, end_year + 1), fill_value=default).to_numpy(dtype=float)
+    except:
+        return np.full(max(end_year - start_year + 1, 0), default, dtype=float)
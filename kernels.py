@@ -0,0 +1,150 @@
+# /modules/kernels.py
+# Jądra obliczeniowe analizy (NumPy oraz opcjonalnie Numba), bez zależności od reszty aplikacji
+
+import numpy as np
+from typing import Tuple
+
+try:
+    from numba import njit
+except ImportError:  # Numba jest opcjonalna - bez niej używamy wersji NumPy
+    njit = None
+
+def risk_stats_numpy(values: np.ndarray) -> Tuple[float, float, float]:
+    """
+    Oblicza odchylenie standardowe i średnią dziennych stóp zwrotu oraz maksymalny drawdown.
+
+    Args:
+        values: Wartości portfela w kolejnych dniach.
+
+    Returns:
+        Krotka (odchylenie standardowe stóp zwrotu, maksymalny drawdown w %, średnia stopa zwrotu).
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Dzienne stopy zwrotu (pomijamy NaN jak pandas)
+        returns = np.diff(values) / values[:-1]
+        returns = returns[~np.isnan(returns)]
+        
+        # fmax pomija NaN (jak cummax w pandas), więc luka w danych nie zeruje maksimum
+        cummax = np.fmax.accumulate(values)
+        drawdown = (values - cummax) / cummax * 100
+    
+    returns_std = returns.std(ddof=1) if len(returns) > 1 else np.nan
+    mean_return = returns.mean() if len(returns) > 0 else np.nan
+    
+    return returns_std, abs(np.fmin.reduce(drawdown)), mean_return
+
+def risk_stats_loop(values: np.ndarray) -> Tuple[float, float, float]:
+    """
+    Wersja `risk_stats_numpy` liczona w jednym przejściu po tablicy (kompilowana przez Numbę).
+
+    Średnią i wariancję stóp zwrotu aktualizujemy algorytmem Welforda, a maksimum
+    i drawdown w tej samej pętli, więc nie powstają tablice pośrednie.
+    """
+    running_max = np.nan
+    min_drawdown = np.nan
+    count = 0
+    mean = 0.0
+    m2 = 0.0
+    
+    for i in range(len(values)):
+        value = values[i]
+        
+        # Maksimum pomija NaN jak np.fmax.accumulate (także na początku serii)
+        if value > running_max or np.isnan(running_max):
+            running_max = value
+        drawdown = (value - running_max) / running_max * 100
+        if not (drawdown >= min_drawdown):
+            if not np.isnan(drawdown):
+                min_drawdown = drawdown
+        
+        if i > 0:
+            ret = (value - values[i - 1]) / values[i - 1]
+            if not np.isnan(ret):
+                count += 1
+                delta = ret - mean
+                mean += delta / count
+                m2 += delta * (ret - mean)
+    
+    returns_std = np.sqrt(m2 / (count - 1)) if count > 1 else np.nan
+    mean_return = mean if count > 0 else np.nan
+    
+    return returns_std, abs(min_drawdown), mean_return
+
+# fastmath pomijamy celowo - zakłada brak NaN, a na nich opiera się filtrowanie stóp zwrotu
+risk_kernel = (
+    njit(cache=True, error_model='numpy')(risk_stats_loop) if njit is not None else risk_stats_numpy
+)
+
+def rebalance_numpy(
+    holdings: np.ndarray,
+    value_prices: np.ndarray,
+    target_prices: np.ndarray,
+    target_weights: np.ndarray,
+    target_idx: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Przechodzi kolejne daty rebalancingu i wyznacza różnice wartości metali docelowych.
+
+    Args:
+        holdings: Ilości metali (w kolejności kolumn `value_prices`).
+        value_prices: Ceny metali (daty x metale) do wyceny portfela.
+        target_prices: Ceny metali docelowych (daty x metale docelowe).
+        target_weights: Docelowe udziały metali (ułamki).
+        target_idx: Pozycja metalu docelowego w `holdings` (-1 = metal spoza listy).
+
+    Returns:
+        Krotka (różnice wartości, maska wykonanych operacji), obie o wymiarach daty x metale docelowe.
+    """
+    holdings = holdings.copy()
+    known = target_idx >= 0
+    diff_values = np.zeros(target_prices.shape)
+    mask = np.zeros(target_prices.shape, dtype=bool)
+    
+    # Każdy rebalancing zależy od stanu po poprzednim, więc iterujemy po datach
+    for d in range(target_prices.shape[0]):
+        current_values = holdings * value_prices[d]
+        current_target = np.where(known, current_values[target_idx], 0.0)
+        diff_values[d] = current_values.sum() * target_weights - current_target
+        
+        # Ignorujemy małe różnice i metale bez ceny
+        mask[d] = (np.abs(diff_values[d]) > 1) & (target_prices[d] > 0)
+        update = mask[d] & known
+        np.add.at(holdings, target_idx[update], diff_values[d, update] / target_prices[d, update])
+    
+    return diff_values, mask
+
+def rebalance_loop(
+    holdings: np.ndarray,
+    value_prices: np.ndarray,
+    target_prices: np.ndarray,
+    target_weights: np.ndarray,
+    target_idx: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Wersja `rebalance_numpy` na pętlach skalarnych (kompilowana przez Numbę)."""
+    holdings = holdings.copy()
+    n_dates, n_targets = target_prices.shape
+    diff_values = np.zeros((n_dates, n_targets))
+    mask = np.zeros((n_dates, n_targets), dtype=np.bool_)
+    
+    for d in range(n_dates):
+        total_value = 0.0
+        for m in range(holdings.shape[0]):
+            total_value += holdings[m] * value_prices[d, m]
+        
+        # Różnice liczymy dla stanu sprzed bieżącego rebalancingu
+        for t in range(n_targets):
+            current = 0.0
+            if target_idx[t] >= 0:
+                current = holdings[target_idx[t]] * value_prices[d, target_idx[t]]
+            diff_values[d, t] = total_value * target_weights[t] - current
+            mask[d, t] = abs(diff_values[d, t]) > 1 and target_prices[d, t] > 0
+        
+        for t in range(n_targets):
+            if mask[d, t] and target_idx[t] >= 0:
+                holdings[target_idx[t]] += diff_values[d, t] / target_prices[d, t]
+    
+    return diff_values, mask
+
+rebalance_kernel = (
+    njit(cache=True, error_model='numpy')(rebalance_loop) if njit is not None else rebalance_numpy
+)
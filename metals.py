@@ -1,16 +1,33 @@
 # /main/metals.py
 
+import numpy as np
 import pandas as pd
 
+# Kolumny cen metali (w EUR) oraz kolumny kursów dla walut docelowych
+METAL_PRICE_COLUMNS = ["Gold_EUR", "Silver_EUR", "Platinum_EUR", "Palladium_EUR"]
+FX_COLUMNS = {"USD": "EUR_USD", "PLN": "EUR_PLN"}
+
 def load_metal_prices(file_path: str) -> pd.DataFrame:
     """Ładuje ceny metali z pliku CSV."""
-    prices = pd.read_csv(file_path, parse_dates=["Data"])
+    prices = pd.read_csv(
+        file_path,
+        engine="c",
+        parse_dates=["Data"],
+        usecols=["Data", *METAL_PRICE_COLUMNS],
+        dtype=dict.fromkeys(METAL_PRICE_COLUMNS, "float64"),
+    )
     prices.sort_values("Data", inplace=True)
     return prices
 
 def load_exchange_rates(file_path: str) -> pd.DataFrame:
     """Ładuje kursy walutowe z pliku CSV."""
-    rates = pd.read_csv(file_path, parse_dates=["Data"])
+    rates = pd.read_csv(
+        file_path,
+        engine="c",
+        parse_dates=["Data"],
+        usecols=["Data", *FX_COLUMNS.values()],
+        dtype=dict.fromkeys(FX_COLUMNS.values(), "float64"),
+    )
     rates.sort_values("Data", inplace=True)
     return rates
 
@@ -26,21 +43,16 @@ def convert_prices_to_currency(prices_df: pd.DataFrame, rates_df: pd.DataFrame,
     Returns:
         DataFrame z cenami metali w wybranej walucie.
     """
-    merged = pd.merge(prices_df, rates_df, on="Data", how="left")
+    # Dołączamy ostatni znany kurs z dnia notowania lub wcześniejszy (obie ramki są posortowane po dacie)
+    merged = pd.merge_asof(prices_df, rates_df, on="Data", direction="backward")
 
     if currency == "EUR":
         return merged
-    elif currency == "USD":
-        merged["Gold_EUR"] = merged["Gold_EUR"] * merged["EUR_USD"]
-        merged["Silver_EUR"] = merged["Silver_EUR"] * merged["EUR_USD"]
-        merged["Platinum_EUR"] = merged["Platinum_EUR"] * merged["EUR_USD"]
-        merged["Palladium_EUR"] = merged["Palladium_EUR"] * merged["EUR_USD"]
-    elif currency == "PLN":
-        merged["Gold_EUR"] = merged["Gold_EUR"] * merged["EUR_PLN"]
-        merged["Silver_EUR"] = merged["Silver_EUR"] * merged["EUR_PLN"]
-        merged["Platinum_EUR"] = merged["Platinum_EUR"] * merged["EUR_PLN"]
-        merged["Palladium_EUR"] = merged["Palladium_EUR"] * merged["EUR_PLN"]
-    else:
+    elif currency not in FX_COLUMNS:
         raise ValueError(f"Unsupported currency: {currency}")
 
+    # Jedno mnożenie macierzy cen (kolumnowo, F-order) przez wektor kursu
+    prices = np.asfortranarray(merged[METAL_PRICE_COLUMNS].to_numpy(dtype=float))
+    merged[METAL_PRICE_COLUMNS] = prices * merged[FX_COLUMNS[currency]].to_numpy()[:, None]
+
     return merged
@@ -1,7 +1,12 @@
 # /main/portfolio.py
 
+import numpy as np
 import pandas as pd
 
+# Kategorie kolumn tekstowych rejestru (porównania i grupowania na kodach zamiast napisów)
+METALS = ['Gold', 'Silver', 'Platinum', 'Palladium']
+OPERATION_TYPES = ['Zakup', 'Sprzedaż']
+
 def build_portfolio(schedule: pd.DataFrame, metal_prices: pd.DataFrame, allocation: dict, purchase_margin: float = 2.0) -> pd.DataFrame:
     """
     Buduje rejestr operacji zakupowych na podstawie harmonogramu i alokacji.
@@ -15,40 +20,45 @@ def build_portfolio(schedule: pd.DataFrame, metal_prices: pd.DataFrame, allocati
     Returns:
         DataFrame z rejestrem operacji.
     """
-    portfolio_records = []
-
-    for _, row in schedule.iterrows():
-        date = pd.to_datetime(row['Data'])
-        amount = row['Kwota']
-
-        # Szukamy ceny na daną datę
-        daily_prices = metal_prices[metal_prices['Data'] == date]
-
-        if daily_prices.empty:
-            # Jeśli brak cen w dniu zakupu, bierzemy pierwszy następny dostępny dzień
-            daily_prices = metal_prices[metal_prices['Data'] > date].head(1)
-            if daily_prices.empty:
-                continue
-
-        for metal, alloc_percent in allocation.items():
-            if alloc_percent > 0:
-                alloc_amount = amount * (alloc_percent / 100)
-                metal_price = daily_prices[metal.capitalize()].values[0]
-                price_with_margin = metal_price * (1 + purchase_margin / 100)
-                quantity = alloc_amount / price_with_margin
-
-                portfolio_records.append({
-                    'Data': date,
-                    'Typ operacji': 'Zakup',
-                    'Metal': metal.capitalize(),
-                    'Ilość': quantity,
-                    'Cena jednostkowa': price_with_margin,
-                    'Kwota operacji': alloc_amount,
-                    'Koszt magazynowania': 0.0,
-                    'Sprzedaż na koszty': 0.0
-                })
-
-    portfolio_df = pd.DataFrame(portfolio_records)
+    # Loader zwraca ceny posortowane po dacie - sortujemy tylko, gdy kolejność nie jest zachowana,
+    # i wyszukujemy wszystkie daty harmonogramu jednym wywołaniem
+    if not metal_prices['Data'].is_monotonic_increasing:
+        metal_prices = metal_prices.sort_values('Data')
+    price_dates = metal_prices['Data'].to_numpy()
+    dates = pd.to_datetime(schedule['Data']).to_numpy()
+
+    # Cena z danego dnia, a jeśli brak - z pierwszego następnego dostępnego dnia
+    pos = np.searchsorted(price_dates, dates.astype(price_dates.dtype), side='left')
+    found = pos < len(price_dates)
+    dates, pos = dates[found], pos[found]
+    amounts = schedule['Kwota'].to_numpy(dtype=float)[found]
+
+    metals = [metal.capitalize() for metal, alloc_percent in allocation.items() if alloc_percent > 0]
+    percents = np.array([alloc_percent for alloc_percent in allocation.values() if alloc_percent > 0], dtype=float)
+
+    if len(dates) == 0 or not metals:
+        return pd.DataFrame()
+
+    # Macierze (daty x metale) spłaszczane wierszami - kolejność jak w harmonogramie
+    alloc_amounts = amounts[:, None] * (percents / 100)
+    prices_with_margin = metal_prices[metals].to_numpy(dtype=float)[pos] * (1 + purchase_margin / 100)
+
+    # Metal i typ operacji jako kategorie budowane bezpośrednio z kodów
+    metal_categories = list(dict.fromkeys(METALS + metals))
+    metal_codes = np.array([metal_categories.index(metal) for metal in metals], dtype=np.int8)
+
+    portfolio_df = pd.DataFrame({
+        'Data': np.repeat(dates, len(metals)),
+        'Typ operacji': pd.Categorical.from_codes(
+            np.zeros(len(dates) * len(metals), dtype=np.int8), categories=OPERATION_TYPES
+        ),
+        'Metal': pd.Categorical.from_codes(np.tile(metal_codes, len(dates)), categories=metal_categories),
+        'Ilość': (alloc_amounts / prices_with_margin).ravel(),
+        'Cena jednostkowa': prices_with_margin.ravel(),
+        'Kwota operacji': alloc_amounts.ravel(),
+        'Koszt magazynowania': 0.0,
+        'Sprzedaż na koszty': 0.0
+    })
     return portfolio_df
 
 def aggregate_portfolio(df_portfolio: pd.DataFrame) -> pd.DataFrame:
@@ -64,8 +74,8 @@ def aggregate_portfolio(df_portfolio: pd.DataFrame) -> pd.DataFrame:
     if df_portfolio.empty:
         return pd.DataFrame()
 
-    current_portfolio = df_portfolio.copy()
-    metals_summary = current_portfolio.groupby('Metal').agg({
+    # Agregacja nie modyfikuje rejestru, więc nie potrzebujemy jego kopii
+    metals_summary = df_portfolio.groupby('Metal', observed=True).agg({
         'Ilość': 'sum',
         'Kwota operacji': 'sum'
     }).reset_index()
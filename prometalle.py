@@ -8,12 +8,21 @@ import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
 import plotly.express as px
-import matplotlib.pyplot as plt
 from datetime import datetime, timedelta
-from typing import Dict, List, Tuple, Optional, Union, Any
+from typing import Dict, Iterable, List, Tuple, Optional, Union, Any
 import os
 import base64
 from io import BytesIO
+from pathlib import Path
+import hashlib
+from functools import lru_cache
+from types import MappingProxyType
+
+try:
+    import pyarrow as pa
+    from pyarrow import feather
+except ImportError:  # pyarrow jest opcjonalny - bez niego wczytujemy bezpośrednio CSV
+    pa = feather = None
 
 #############################################################################
 # KONFIGURACJA
@@ -24,53 +33,106 @@ DEFAULT_LANGUAGE = 'pl'      # Domyślny język: polski
 DEFAULT_CURRENCY = 'EUR'     # Domyślna waluta: Euro
 DEFAULT_UNIT = 'g'           # Domyślna jednostka: gramy
 
-# Dostępne opcje
-AVAILABLE_LANGUAGES = ['pl', 'en', 'de']
-AVAILABLE_CURRENCIES = ['PLN', 'EUR', 'USD']
-AVAILABLE_UNITS = ['g', 'oz']
+# Dostępne opcje (stałe konfiguracji są niemodyfikowalne: krotki i MappingProxyType)
+AVAILABLE_LANGUAGES = ('pl', 'en', 'de')
+AVAILABLE_CURRENCIES = ('PLN', 'EUR', 'USD')
+AVAILABLE_UNITS = ('g', 'oz')
 
 # Etykiety językowe
-LANGUAGE_LABELS = {
+LANGUAGE_LABELS = MappingProxyType({
     "pl": "Polski",
     "en": "English",
     "de": "Deutsch"
-}
+})
+
+# Etykiety opcji w panelu bocznym (stałe, aby nie budować słowników przy każdym renderze)
+UNIT_LABELS = MappingProxyType({
+    "g": "Gramy (g)",
+    "oz": "Uncje (oz)"
+})
+WEEKDAY_LABELS = MappingProxyType({
+    0: "Poniedziałek",
+    1: "Wtorek",
+    2: "Środa",
+    3: "Czwartek",
+    4: "Piątek"
+})
+STORAGE_BASE_LABELS = MappingProxyType({
+    "value": "Wartość metali",
+    "invested_amount": "Zainwestowana kwota"
+})
+STORAGE_FREQUENCY_LABELS = MappingProxyType({
+    "monthly": "Miesięczna",
+    "yearly": "Roczna"
+})
 
 # Roczne inflacje domyślne (jeśli brak danych w CSV)
-DEFAULT_INFLATION = {
+DEFAULT_INFLATION = MappingProxyType({
     'PLN': 0.06,    # 6% rocznie
     'EUR': 0.02,    # 2% rocznie
     'USD': 0.025    # 2,5% rocznie
-}
+})
 
 # Przeliczniki jednostek
-UNITS_CONVERSION = {
+UNITS_CONVERSION = MappingProxyType({
     'g_to_oz': 0.03215,      # gramy na uncje
     'oz_to_g': 31.1035       # uncje na gramy
-}
+})
+
+# Kolumny cen metali oraz kolumny kursów EUR dla walut docelowych
+METAL_COLUMNS = ['Gold', 'Silver', 'Platinum', 'Palladium']
+FX_COLUMNS = MappingProxyType({
+    'USD': 'EUR_USD',
+    'PLN': 'EUR_PLN'
+})
+
+# Nazwy metali (małymi literami, także polskie) -> nazwa kolumny z ceną
+METAL_CANONICAL = MappingProxyType({
+    'gold': 'Gold', 'złoto': 'Gold',
+    'silver': 'Silver', 'srebro': 'Silver',
+    'platinum': 'Platinum', 'platyna': 'Platinum',
+    'palladium': 'Palladium', 'pallad': 'Palladium'
+})
+
+# Typy operacji w rejestrze (kolumna kategoryczna - porównania i grupowania na kodach)
+OPERATION_TYPES = ['Zakup', 'Sprzedaż']
 
 # Kolory metali do wykresów
-METAL_COLORS = {
+METAL_COLORS = MappingProxyType({
     'Gold': '#FFD700',      # Złoto
     'Silver': '#C0C0C0',    # Srebro
     'Platinum': '#E5E4E2',  # Platyna
     'Palladium': '#8A8B8C'  # Pallad
-}
-
-# Historyczne wydarzenia na wykresach
-HISTORICAL_EVENTS = {
-    '2008-09-15': 'Upadek Lehman Brothers',
-    '2011-08-22': 'Szczyt ceny złota',
-    '2020-03-23': 'Krach COVID-19',
-    '2022-02-24': 'Inwazja Rosji na Ukrainę'
-}
+})
+
+# Polskie nazwy metali dla wykresów i odwrotne mapowanie (budowane raz, a nie przy każdym renderze)
+METAL_NAMES_PL = MappingProxyType({
+    'Gold': 'Złoto',
+    'Silver': 'Srebro',
+    'Platinum': 'Platyna',
+    'Palladium': 'Pallad'
+})
+METAL_BY_NAME_PL = MappingProxyType({name: metal for metal, name in METAL_NAMES_PL.items()})
+
+# Pamięć podręczna wczytanych plików danych: wpisy wygasają po dobie, a na plik
+# trzymamy najwyżej dwie wersje (bieżącą i poprzednią, np. po podmianie CSV)
+CACHE_EXPIRY_HOURS = 24
+CACHE_MAX_ENTRIES = 2
+
+# Historyczne wydarzenia na wykresach (daty parsowane raz, przy imporcie)
+HISTORICAL_EVENTS = MappingProxyType({
+    pd.Timestamp('2008-09-15'): 'Upadek Lehman Brothers',
+    pd.Timestamp('2011-08-22'): 'Szczyt ceny złota',
+    pd.Timestamp('2020-03-23'): 'Krach COVID-19',
+    pd.Timestamp('2022-02-24'): 'Inwazja Rosji na Ukrainę'
+})
 
 #############################################################################
 # TŁUMACZENIA
 #############################################################################
 
-# Słownik tłumaczeń
-TRANSLATIONS = {
+# Słownik tłumaczeń (niemodyfikowalny, jak pozostałe stałe konfiguracji)
+TRANSLATIONS = MappingProxyType({
     # Ogólne ustawienia
     "choose_language": {
         "pl": "Wybierz język",
@@ -384,16 +446,25 @@ TRANSLATIONS = {
         "en": "Prometalle - Precious metals investment simulator. Simulation does not constitute investment advice.",
         "de": "Prometalle - Simulator für Investitionen in Edelmetalle. Die Simulation stellt keine Anlageberatung dar."
     }
-}
+})
+
+# Tłumaczenia odwrócone do płaskich słowników per język, z rozwiązanym już fallbackiem na angielski
+TRANSLATIONS_BY_LANGUAGE = MappingProxyType({
+    language: MappingProxyType({
+        key: texts.get(language, texts.get('en', key)) for key, texts in TRANSLATIONS.items()
+    })
+    for language in dict.fromkeys(AVAILABLE_LANGUAGES + ('en',))
+})
 
+@lru_cache(maxsize=512)
 def translate(key: str, language: str = DEFAULT_LANGUAGE) -> str:
-    """Zwraca tłumaczenie danego klucza w wybranym języku."""
-    if key in TRANSLATIONS:
-        if language in TRANSLATIONS[key]:
-            return TRANSLATIONS[key][language]
-        elif 'en' in TRANSLATIONS[key]:
-            return TRANSLATIONS[key]['en']
-    return key
+    """Zwraca tłumaczenie danego klucza w wybranym języku (wyniki są zapamiętywane)."""
+    return TRANSLATIONS_BY_LANGUAGE.get(language, TRANSLATIONS_BY_LANGUAGE['en']).get(key, key)
+
+def translate_many(keys: Iterable[str], language: str = DEFAULT_LANGUAGE) -> List[str]:
+    """Zwraca tłumaczenia wielu kluczy naraz (jedno wyszukiwanie słownika języka)."""
+    texts = TRANSLATIONS_BY_LANGUAGE.get(language, TRANSLATIONS_BY_LANGUAGE['en'])
+    return [texts.get(key, key) for key in keys]
 
 #############################################################################
 # FUNKCJE POMOCNICZE
@@ -477,7 +548,12 @@ def convert_df_to_csv_download_link(df, filename="data.csv"):
 def create_excel_download_link(data_dict, filename="data.xlsx"):
     """Generuje link do pobrania słownika DataFrame jako Excel."""
     output = BytesIO()
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
+    try:
+        # xlsxwriter zapisuje szybciej niż openpyxl; bez constant_memory, bo pandas pisze kolumnami
+        writer = pd.ExcelWriter(output, engine='xlsxwriter')
+    except ImportError:
+        writer = pd.ExcelWriter(output, engine='openpyxl')
+    with writer:
         for sheet_name, df in data_dict.items():
             df.to_excel(writer, sheet_name=sheet_name, index=False)
     excel_data = output.getvalue()
@@ -485,56 +561,150 @@ def create_excel_download_link(data_dict, filename="data.xlsx"):
     href = f'<a href="data:application/vnd.openxmlformats-officedocument.spreadsheetml.sheet;base64,{b64}" download="{filename}">Pobierz plik Excel</a>'
     return href
 
-@st.cache_data
-def load_metal_prices(file_path: str) -> pd.DataFrame:
-    """Ładuje ceny metali z pliku CSV."""
+def _sidecar_metadata(csv_path: Path, read_kwargs: Dict[str, Any]) -> Dict[bytes, bytes]:
+    """Zwraca metadane kopii Feather: mtime i rozmiar pliku CSV oraz skrót opcji odczytu."""
+    source = csv_path.stat()
+    options = repr(sorted(read_kwargs.items()))
+    return {
+        b'source_mtime_ns': str(source.st_mtime_ns).encode(),
+        b'source_size': str(source.st_size).encode(),
+        b'read_options': hashlib.sha1(options.encode()).hexdigest().encode(),
+    }
+
+def _cached_read(
+    file_path: str,
+    parse_dates: Optional[List[str]] = None,
+    usecols: Optional[List[str]] = None,
+    dtype: Optional[Dict[str, str]] = None
+) -> pd.DataFrame:
+    """
+    Wczytuje plik CSV, korzystając z binarnej kopii (Arrow/Feather) obok pliku źródłowego.
+
+    Przy pierwszym odczycie CSV jest parsowany, sortowany po dacie i zapisywany
+    jako nieskompresowany `.feather`. Kolejne uruchomienia mapują gotową kopię
+    do pamięci (mmap), dopóki zgadzają się zapisane w niej mtime i rozmiar CSV
+    oraz opcje odczytu (`usecols`, `dtype`, `parse_dates`).
+    """
+    csv_path = Path(file_path)
+    feather_path = csv_path.with_suffix('.feather')
+    read_kwargs = dict(parse_dates=parse_dates, usecols=usecols, dtype=dtype)
+    metadata = None
+
+    # Brak CSV lub kopii zgłasza FileNotFoundError, więc nie sprawdzamy osobno exists()
+    try:
+        if feather is not None:
+            metadata = _sidecar_metadata(csv_path, read_kwargs)
+            table = feather.read_table(feather_path, memory_map=True)
+            stored = table.schema.metadata or {}
+            if all(stored.get(key) == value for key, value in metadata.items()):
+                return table.to_pandas(zero_copy_only=False)
+    except (OSError, ValueError):
+        pass  # Brak lub uszkodzona kopia - wracamy do CSV
+
+    # Jawny schemat: parser nie musi zgadywać typów ani wczytywać zbędnych kolumn.
+    # Wielowątkowy parser pyarrow, a gdy go brak lub nie obsługuje opcji - parser C
+    df = None
+    if feather is not None:
+        try:
+            df = pd.read_csv(csv_path, engine='pyarrow', **read_kwargs)
+        except ValueError:
+            pass  # Opcja nieobsługiwana przez parser pyarrow
+    if df is None:
+        df = pd.read_csv(csv_path, engine='c', **read_kwargs)
+    if parse_dates:
+        df = df.sort_values(parse_dates[0]).reset_index(drop=True)
+
+    if metadata is not None:
+        try:
+            # Metadane ze stanu CSV sprzed parsowania: zmiana w trakcie odczytu unieważni kopię.
+            # Bez kompresji, aby odczyt przez mmap nie wymagał dekodowania
+            table = pa.Table.from_pandas(df)
+            table = table.replace_schema_metadata({**(table.schema.metadata or {}), **metadata})
+            feather.write_feather(table, feather_path, compression='uncompressed')
+        except (OSError, ValueError):
+            pass  # Kopia jest tylko optymalizacją
+
+    return df
+
+def _file_mtime(file_path: str) -> Optional[float]:
+    """Zwraca czas modyfikacji pliku (klucz cache) lub None, jeśli plik nie istnieje."""
+    try:
+        return os.path.getmtime(file_path)
+    except OSError:
+        return None
+
+@st.cache_data(show_spinner=False, ttl=CACHE_EXPIRY_HOURS * 3600, max_entries=CACHE_MAX_ENTRIES)
+def load_metal_prices(file_path: str, mtime: Optional[float] = None) -> pd.DataFrame:
+    """Ładuje ceny metali z pliku CSV (posortowane po dacie)."""
     try:
-        prices = pd.read_csv(file_path, parse_dates=["Data"])
-        prices.sort_values("Data", inplace=True)
-        return prices
+        # Schemat budujemy z nagłówka pliku: kolumny cen mają różne nazwy (np. Gold lub Gold_EUR),
+        # a wszystkie kolumny poza datą to ceny
+        header = pd.read_csv(file_path, nrows=0).columns
+        return _cached_read(file_path, parse_dates=["Data"], dtype=dict.fromkeys(header.drop("Data"), 'float64'))
     except Exception as e:
         st.error(f"Błąd podczas ładowania cen metali: {e}")
         return pd.DataFrame()
 
-@st.cache_data
-def load_exchange_rates(file_path: str) -> pd.DataFrame:
-    """Ładuje kursy walutowe z pliku CSV."""
+@st.cache_data(show_spinner=False, ttl=CACHE_EXPIRY_HOURS * 3600, max_entries=CACHE_MAX_ENTRIES)
+def load_exchange_rates(file_path: str, mtime: Optional[float] = None) -> pd.DataFrame:
+    """Ładuje kursy walutowe z pliku CSV (posortowane po dacie)."""
     try:
-        rates = pd.read_csv(file_path, parse_dates=["Data"])
-        rates.sort_values("Data", inplace=True)
-        return rates
+        return _cached_read(
+            file_path,
+            parse_dates=["Data"],
+            usecols=["Data", *FX_COLUMNS.values()],
+            dtype=dict.fromkeys(FX_COLUMNS.values(), 'float64')
+        )
     except Exception as e:
         st.error(f"Błąd podczas ładowania kursów walut: {e}")
         return pd.DataFrame()
 
-@st.cache_data
-def load_inflation_rates(file_path: str) -> pd.DataFrame:
+@st.cache_data(show_spinner=False, ttl=CACHE_EXPIRY_HOURS * 3600, max_entries=CACHE_MAX_ENTRIES)
+def load_inflation_rates(file_path: str, mtime: Optional[float] = None) -> pd.DataFrame:
     """Ładuje dane o inflacji z pliku CSV."""
     try:
-        df = pd.read_csv(file_path)
+        df = _cached_read(
+            file_path,
+            usecols=['Rok', 'waluta', 'roczna_inflacja'],
+            dtype={'Rok': 'int64', 'waluta': 'category', 'roczna_inflacja': 'float64'}
+        )
         if {'Rok', 'waluta', 'roczna_inflacja'}.issubset(df.columns):
             return df
         else:
             raise ValueError("Brak wymaganych kolumn w pliku CSV.")
     except Exception as e:
         # Zwróć domyślne inflacje w prostym DataFrame
-        data = []
-        for year in range(1997, 2030):
-            for currency, rate in DEFAULT_INFLATION.items():
-                data.append({'Rok': year, 'waluta': currency, 'roczna_inflacja': rate})
-        return pd.DataFrame(data)
-
-def get_inflation_rate(df_inflation: pd.DataFrame, year: int, currency: str) -> float:
-    """Zwraca roczną inflację dla podanego roku i waluty."""
+        # Kolumny budujemy od razu jako tablice (lata x waluty), bez listy słowników
+        years = np.arange(1997, 2030)
+        currencies = list(DEFAULT_INFLATION)
+        return pd.DataFrame({
+            'Rok': np.repeat(years, len(currencies)),
+            'waluta': np.tile(currencies, len(years)),
+            'roczna_inflacja': np.tile(list(DEFAULT_INFLATION.values()), len(years))
+        })
+
+def build_inflation_lookup(df_inflation: pd.DataFrame) -> Dict[Tuple[int, str], float]:
+    """Buduje słownik {(rok, waluta): inflacja} z tabeli inflacji (pierwszy wpis wygrywa)."""
+    first = df_inflation.drop_duplicates(['Rok', 'waluta'])
+    keys = zip(first['Rok'].tolist(), first['waluta'].astype(str).tolist())
+    return dict(zip(keys, first['roczna_inflacja'].astype(float).tolist()))
+
+@st.cache_data(show_spinner=False, ttl=CACHE_EXPIRY_HOURS * 3600, max_entries=CACHE_MAX_ENTRIES)
+def load_inflation_lookup(file_path: str, mtime: Optional[float] = None) -> Dict[Tuple[int, str], float]:
+    """Zwraca słownik inflacji zbudowany raz dla wczytanej tabeli (cache jak w loaderach)."""
+    return build_inflation_lookup(load_inflation_rates(file_path, mtime))
+
+def get_inflation_rate(inflation_lookup: Dict[Tuple[int, str], float], year: int, currency: str) -> float:
+    """Zwraca roczną inflację dla podanego roku i waluty ze słownika z load_inflation_lookup."""
     try:
-        rate = df_inflation[(df_inflation['Rok'] == year) & (df_inflation['waluta'] == currency)]['roczna_inflacja'].values
-        if len(rate) > 0:
-            return float(rate[0])
-        else:
-            return DEFAULT_INFLATION.get(currency, 0.02)
+        return inflation_lookup[(year, currency)]
     except:
         return DEFAULT_INFLATION.get(currency, 0.02)
 
+def _plot_values(series: pd.Series) -> np.ndarray:
+    """Zwraca wartości osi Y jako float32 - Plotly 6+ wysyła tablice binarnie, więc to o połowę mniej danych."""
+    return series.to_numpy(dtype=np.float32)
+
 #############################################################################
 # FUNKCJE OBSŁUGI METALI I KURSÓW WALUT
 #############################################################################
@@ -544,25 +714,41 @@ def convert_prices_to_currency(prices_df: pd.DataFrame, rates_df: pd.DataFrame,
     if prices_df.empty or rates_df.empty:
         return pd.DataFrame()
         
-    merged = pd.merge(prices_df, rates_df, on="Data", how="left")
+    # Dołączamy ostatni znany kurs z dnia notowania lub wcześniejszy (obie ramki są posortowane po dacie)
+    merged = pd.merge_asof(prices_df, rates_df, on="Data", direction="backward")
 
     if currency == "EUR":
         return merged
-    elif currency == "USD":
-        merged["Gold"] = merged["Gold"] * merged["EUR_USD"]
-        merged["Silver"] = merged["Silver"] * merged["EUR_USD"]
-        merged["Platinum"] = merged["Platinum"] * merged["EUR_USD"]
-        merged["Palladium"] = merged["Palladium"] * merged["EUR_USD"]
-    elif currency == "PLN":
-        merged["Gold"] = merged["Gold"] * merged["EUR_PLN"]
-        merged["Silver"] = merged["Silver"] * merged["EUR_PLN"]
-        merged["Platinum"] = merged["Platinum"] * merged["EUR_PLN"]
-        merged["Palladium"] = merged["Palladium"] * merged["EUR_PLN"]
-    else:
+    elif currency not in FX_COLUMNS:
         raise ValueError(f"Unsupported currency: {currency}")
 
+    # Jedno mnożenie macierzy cen (kolumnowo, F-order) przez wektor kursu
+    prices = np.asfortranarray(merged[METAL_COLUMNS].to_numpy(dtype=float))
+    merged[METAL_COLUMNS] = prices * merged[FX_COLUMNS[currency]].to_numpy()[:, None]
+
     return merged
 
+def find_price_indices(price_dates: np.ndarray, dates: np.ndarray) -> np.ndarray:
+    """
+    Zwraca indeksy notowań dla tablicy dat w posortowanej tablicy dat.
+
+    Wybiera notowanie z danego dnia, a gdy go brak - najbliższe wcześniejsze.
+    Dla dat sprzed pierwszego notowania zwraca pierwsze dostępne (0).
+    """
+    targets = np.asarray(dates).astype(price_dates.dtype)
+    pos = np.searchsorted(price_dates, targets, side='left')
+    exact = (pos < len(price_dates)) & (price_dates[np.minimum(pos, len(price_dates) - 1)] == targets)
+    return np.where(exact, pos, np.maximum(pos - 1, 0))
+
+def filter_date_range(df: pd.DataFrame, start_date, end_date) -> pd.DataFrame:
+    """Zwraca wiersze z datą w [start_date, end_date]; dla danych posortowanych wyszukuje granice binarnie."""
+    dates = df['Data']
+    if dates.is_monotonic_increasing:
+        start = dates.searchsorted(pd.Timestamp(start_date), side='left')
+        end = dates.searchsorted(pd.Timestamp(end_date), side='right')
+        return df.iloc[start:end]
+    return df[(dates >= start_date) & (dates <= end_date)]
+
 #############################################################################
 # FUNKCJE HARMONOGRAMU ZAKUPÓW
 #############################################################################
@@ -628,52 +814,47 @@ def build_portfolio(
     purchase_margin: float = 2.0
 ) -> pd.DataFrame:
     """Buduje rejestr operacji zakupowych na podstawie harmonogramu i alokacji."""
-    portfolio_records = []
-
     if schedule.empty or metal_prices.empty:
         return pd.DataFrame()
 
-    # Upewnij się, że dane są posortowane
-    metal_prices = metal_prices.sort_values('Data')
-
-    for _, row in schedule.iterrows():
-        date = pd.to_datetime(row['Data'])
-        amount = row['Kwota']
-
-        # Szukamy ceny na datę lub najbliższą wcześniejszą
-        daily_prices = metal_prices[metal_prices['Data'] == date]
-
-        if daily_prices.empty:
-            daily_prices = metal_prices[metal_prices['Data'] < date].sort_values('Data', ascending=False).head(1)
-
-        if daily_prices.empty:
-            daily_prices = metal_prices[metal_prices['Data'] > date].sort_values('Data', ascending=True).head(1)
-
-        if daily_prices.empty:
-            continue  # Brak danych całkowicie, pomijamy
-
-        for metal, alloc_percent in allocation.items():
-            if alloc_percent > 0:
-                alloc_amount = amount * (alloc_percent / 100)
-                metal_price_col = metal.capitalize()
+    # Loader zwraca ceny posortowane po dacie - sortujemy tylko, gdy kolejność nie jest zachowana
+    if not metal_prices['Data'].is_monotonic_increasing:
+        metal_prices = metal_prices.sort_values('Data')
+    dates = pd.to_datetime(schedule['Data']).to_numpy()
+    pos = find_price_indices(metal_prices['Data'].to_numpy(), dates)
+    amounts = schedule['Kwota'].to_numpy(dtype=float)
+
+    # Metale z dodatnią alokacją, dla których mamy kolumnę z ceną
+    canonical = {metal: METAL_CANONICAL.get(metal.lower(), metal.capitalize()) for metal in allocation}
+    active = [
+        (canonical[metal], alloc_percent) for metal, alloc_percent in allocation.items()
+        if alloc_percent > 0 and canonical[metal] in metal_prices.columns
+    ]
+    if not active:
+        return pd.DataFrame()
+    metals = [metal for metal, _ in active]
+    percents = np.array([alloc_percent for _, alloc_percent in active], dtype=float)
 
-                if metal_price_col in daily_prices.columns:
-                    metal_price = daily_prices[metal_price_col].values[0]
-                    price_with_margin = metal_price * (1 + purchase_margin / 100)
-                    quantity = alloc_amount / price_with_margin
+    # Macierze (daty x metale) spłaszczane wierszami - kolejność jak w harmonogramie
+    alloc_amounts = amounts[:, None] * (percents / 100)
+    prices_with_margin = metal_prices[metals].to_numpy(dtype=float)[pos] * (1 + purchase_margin / 100)
 
-                    portfolio_records.append({
-                        'Data': date,
-                        'Typ operacji': 'Zakup',
-                        'Metal': metal.capitalize(),
-                        'Ilość': quantity,
-                        'Cena jednostkowa': price_with_margin,
-                        'Kwota operacji': alloc_amount,
-                        'Koszt_magazynowania': 0.0,
-                        'Kwota_po_kosztach': alloc_amount
-                    })
+    # Metal i typ operacji jako kategorie budowane bezpośrednio z kodów
+    metal_categories = list(dict.fromkeys(METAL_COLUMNS + metals))
+    metal_codes = np.array([metal_categories.index(metal) for metal in metals], dtype=np.int8)
 
-    portfolio_df = pd.DataFrame(portfolio_records)
+    portfolio_df = pd.DataFrame({
+        'Data': np.repeat(dates, len(metals)),
+        'Typ operacji': pd.Categorical.from_codes(
+            np.zeros(len(dates) * len(metals), dtype=np.int8), categories=OPERATION_TYPES
+        ),
+        'Metal': pd.Categorical.from_codes(np.tile(metal_codes, len(dates)), categories=metal_categories),
+        'Ilość': (alloc_amounts / prices_with_margin).ravel(),
+        'Cena jednostkowa': prices_with_margin.ravel(),
+        'Kwota operacji': alloc_amounts.ravel(),
+        'Koszt_magazynowania': 0.0,
+        'Kwota_po_kosztach': alloc_amounts.ravel()
+    })
     return portfolio_df
 
 def aggregate_portfolio(df_portfolio: pd.DataFrame) -> pd.DataFrame:
@@ -681,23 +862,28 @@ def aggregate_portfolio(df_portfolio: pd.DataFrame) -> pd.DataFrame:
     if df_portfolio.empty:
         return pd.DataFrame()
 
-    current_portfolio = df_portfolio.copy()
-    metals_summary = current_portfolio.groupby('Metal').agg({
+    # Agregacja nie modyfikuje rejestru, więc nie potrzebujemy jego kopii
+    metals_summary = df_portfolio.groupby('Metal', observed=True).agg({
         'Ilość': 'sum',
         'Kwota operacji': 'sum',
         'Cena jednostkowa': 'last'  # Ostatnia cena
     }).reset_index()
     
-    # Dodajemy kolumnę z aktualną wartością
-    metals_summary['Wartość aktualna'] = metals_summary['Ilość'] * metals_summary['Cena jednostkowa']
-    
-    # Obliczamy zysk/stratę
-    metals_summary['Zysk/Strata'] = metals_summary['Wartość aktualna'] - metals_summary['Kwota operacji']
-    
-    # Obliczamy ROI
-    metals_summary['ROI (%)'] = (metals_summary['Zysk/Strata'] / metals_summary['Kwota operacji'] * 100)
-    metals_summary['ROI (%)'] = metals_summary['ROI (%)'].replace([np.inf, -np.inf], 0)
-    metals_summary['ROI (%)'] = metals_summary['ROI (%)'].fillna(0)
+    quantity = metals_summary['Ilość'].to_numpy(dtype=float)
+    invested = metals_summary['Kwota operacji'].to_numpy(dtype=float)
+    current_value = quantity * metals_summary['Cena jednostkowa'].to_numpy(dtype=float)
+    profit = current_value - invested
+
+    # ROI (dzielenie przez zero lub brak danych daje ROI równe 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        roi = profit / invested * 100
+
+    # Wszystkie kolumny pochodne dodajemy jednym wywołaniem assign
+    metals_summary = metals_summary.assign(**{
+        'Wartość aktualna': current_value,
+        'Zysk/Strata': profit,
+        'ROI (%)': np.where(np.isfinite(roi), roi, 0.0),
+    })
 
     return metals_summary
 
@@ -717,8 +903,6 @@ def calculate_storage_costs(
     if df_portfolio.empty:
         return df_portfolio
 
-    df = df_portfolio.copy()
-
     # Ustalenie podstawy naliczania kosztu
     base_column = "Kwota operacji"
 
@@ -730,50 +914,45 @@ def calculate_storage_costs(
 
     vat_multiplier = 1 + vat_rate / 100
 
-    # Grupa po dacie
-    grouped = df.groupby('Data')
-    results = []
-
-    for date, group in grouped:
-        period_cost_net = group[base_column].sum() * period_rate
-        period_cost_gross = period_cost_net * vat_multiplier
-
-        group = group.copy()
-        group['Koszt_magazynowania'] = 0.0
-        group['Kwota_po_kosztach'] = group[base_column]
-
-        if cover_method == "cash":
-            # Koszt pokrywany gotówką – bez zmiany metali
-            group['Koszt_magazynowania'] = period_cost_gross / len(group)
-            group['Kwota_po_kosztach'] = group[base_column] - group['Koszt_magazynowania']
-
-        elif cover_method in ["gold", "silver", "platinum", "palladium"]:
-            selected = group[group['Metal'] == cover_method.capitalize()]
-            if not selected.empty:
-                metal_price = selected.iloc[0]['Cena jednostkowa']
-                grams_to_sell = period_cost_gross / metal_price
-                group.loc[group['Metal'] == cover_method.capitalize(), 'Ilość'] -= grams_to_sell
-                group['Koszt_magazynowania'] = period_cost_gross / len(group)
-                group['Kwota_po_kosztach'] = group['Ilość'] * group['Cena jednostkowa']
-
-        elif cover_method == "all_metals":
-            total_value = group[base_column].sum()
-            for idx, row in group.iterrows():
-                share = row[base_column] / total_value if total_value > 0 else 0
-                metal_share_cost = period_cost_gross * share
-                metal_price = row['Cena jednostkowa']
-                grams_to_sell = metal_share_cost / metal_price
-                group.at[idx, 'Ilość'] -= grams_to_sell
-                group.at[idx, 'Koszt_magazynowania'] = metal_share_cost
-                group.at[idx, 'Kwota_po_kosztach'] = group.at[idx, 'Ilość'] * metal_price
-
-        results.append(group)
-
-    if results:
-        final_df = pd.concat(results)
-        return final_df
-    else:
-        return df
+    # Każda data jest rozliczana niezależnie od pozostałych, więc wszystkie okresy
+    # liczymy naraz na kolumnach (kolejność wierszy jak przy iteracji po grupach dat)
+    dated = df_portfolio['Data'].notna()
+    if not dated.any():
+        return df_portfolio.copy()
+    df = df_portfolio[dated].sort_values('Data', kind='stable')
+
+    by_date = df.groupby('Data')
+    base = df[base_column]
+    period_total = by_date[base_column].transform('sum')
+    period_cost_gross = period_total * period_rate * vat_multiplier
+    rows_per_date = by_date[base_column].transform('size')
+
+    df['Koszt_magazynowania'] = 0.0
+    df['Kwota_po_kosztach'] = base
+
+    if cover_method == "cash":
+        # Koszt pokrywany gotówką – bez zmiany metali
+        df['Koszt_magazynowania'] = period_cost_gross / rows_per_date
+        df['Kwota_po_kosztach'] = base - df['Koszt_magazynowania']
+
+    elif cover_method in ["gold", "silver", "platinum", "palladium"]:
+        # Sprzedajemy wybrany metal po cenie z pierwszego wiersza danej daty
+        selected = df['Metal'] == cover_method.capitalize()
+        has_selected = selected.groupby(df['Data']).transform('any')
+        metal_price = df['Cena jednostkowa'].where(selected).groupby(df['Data']).transform('first')
+        df.loc[selected, 'Ilość'] -= (period_cost_gross / metal_price)[selected]
+        df['Koszt_magazynowania'] = (period_cost_gross / rows_per_date).where(has_selected, 0.0)
+        df['Kwota_po_kosztach'] = (df['Ilość'] * df['Cena jednostkowa']).where(has_selected, base)
+
+    elif cover_method == "all_metals":
+        # Koszt rozkładany proporcjonalnie do udziału każdego wiersza w danej dacie
+        share = (base / period_total).where(period_total > 0, 0.0)
+        metal_share_cost = period_cost_gross * share
+        df['Ilość'] = df['Ilość'] - metal_share_cost / df['Cena jednostkowa']
+        df['Koszt_magazynowania'] = metal_share_cost
+        df['Kwota_po_kosztach'] = df['Ilość'] * df['Cena jednostkowa']
+
+    return df
 
 def total_storage_cost(df_portfolio: pd.DataFrame) -> float:
     """Oblicza całkowity koszt magazynowania."""
@@ -792,19 +971,19 @@ def plot_portfolio_value(df_portfolio: pd.DataFrame, currency: str = 'EUR'):
         st.warning("Brak danych do wyświetlenia wykresu.")
         return
 
-    # Obliczamy wartość depozytu: ilość * aktualna cena metalu
-    df_portfolio['Wartość'] = df_portfolio['Ilość'] * df_portfolio['Cena jednostkowa']
-
-    # Grupujemy po dacie i sumujemy wartość depozytu
-    df_by_date = df_portfolio.groupby('Data').agg({
-        'Wartość': 'sum'
-    }).reset_index()
+    # Wartość depozytu (ilość * cena) zsumowana dla każdej daty: kody dat posortowanych
+    # rosnąco i jedno bincount zamiast groupby (puste daty pomijamy, braki wartości = 0)
+    values = df_portfolio['Ilość'].to_numpy(dtype=float) * df_portfolio['Cena jednostkowa'].to_numpy(dtype=float)
+    codes, dates = pd.factorize(df_portfolio['Data'], sort=True)
+    valid = codes >= 0
+    totals = np.bincount(codes[valid], weights=np.where(np.isnan(values), 0.0, values)[valid], minlength=len(dates))
+    df_by_date = pd.DataFrame({'Data': dates, 'Wartość': totals})
 
     # Dodajemy wykres wartości skumulowanej
     fig = go.Figure()
     
     # Dodajemy linię wartości portfela
-    fig.add_trace(go.Scatter(
+    fig.add_trace(go.Scattergl(
         x=df_by_date['Data'],
         y=df_by_date['Wartość'],
         mode='lines+markers',
@@ -833,10 +1012,14 @@ def plot_portfolio_value(df_portfolio: pd.DataFrame, currency: str = 'EUR'):
     )
     
     # Dodajemy pionowe linie dla ważnych momentów - np. krach
-    for date_str, label in HISTORICAL_EVENTS.items():
+    # Zakres dat wykresu liczymy raz (wartości są posortowane po dacie); gdy brak dat
+    # (np. same NaT), zostaje NaT jak przy min()/max() i żadna linia nie jest dodawana
+    first_date = last_date = pd.NaT
+    if not df_by_date.empty:
+        first_date, last_date = df_by_date['Data'].iloc[0], df_by_date['Data'].iloc[-1]
+    for date, label in HISTORICAL_EVENTS.items():
         try:
-            date = pd.to_datetime(date_str)
-            if date >= df_by_date['Data'].min() and date <= df_by_date['Data'].max():
+            if first_date <= date <= last_date:
                 fig.add_vline(
                     x=date, 
                     line_width=1, 
@@ -906,10 +1089,7 @@ def plot_price_history(
     end_date = pd.to_datetime(end_date)
     
     # Filtrujemy dane w zakresie dat
-    filtered_prices = metal_prices[
-        (metal_prices['Data'] >= start_date) & 
-        (metal_prices['Data'] <= end_date)
-    ]
+    filtered_prices = filter_date_range(metal_prices, start_date, end_date)
     
     if filtered_prices.empty:
         st.warning("Brak danych dla wybranego zakresu dat.")
@@ -919,12 +1099,7 @@ def plot_price_history(
     fig = go.Figure()
     
     # Dodajemy linie dla każdego metalu
-    metals = {
-        'Gold': 'Złoto',
-        'Silver': 'Srebro',
-        'Platinum': 'Platyna',
-        'Palladium': 'Pallad'
-    }
+    metals = METAL_NAMES_PL
     
     # Dodajemy przełączniki dla metali
     metal_options = st.multiselect(
@@ -935,8 +1110,7 @@ def plot_price_history(
     )
     
     # Mapujemy nazwy polskie na angielskie
-    reverse_metals = {v: k for k, v in metals.items()}
-    selected_metals = [reverse_metals[m] for m in metal_options]
+    selected_metals = [METAL_BY_NAME_PL[m] for m in metal_options]
     
     # Jeśli nic nie wybrano, pokazujemy wszystkie
     if not selected_metals:
@@ -946,9 +1120,9 @@ def plot_price_history(
     for metal_eng, metal_pl in metals.items():
         if metal_eng in selected_metals:
             if metal_eng in filtered_prices.columns:
-                fig.add_trace(go.Scatter(
+                fig.add_trace(go.Scattergl(
                     x=filtered_prices['Data'],
-                    y=filtered_prices[metal_eng],
+                    y=_plot_values(filtered_prices[metal_eng]),
                     mode='lines',
                     name=metal_pl,
                     line=dict(color=METAL_COLORS.get(metal_eng, '#808080'), width=2),
@@ -991,10 +1165,7 @@ def plot_comparison_chart(
     end_date = pd.to_datetime(end_date)
     
     # Filtrujemy dane w zakresie dat
-    filtered_prices = metal_prices[
-        (metal_prices['Data'] >= start_date) & 
-        (metal_prices['Data'] <= end_date)
-    ]
+    filtered_prices = filter_date_range(metal_prices, start_date, end_date)
     
     if filtered_prices.empty:
         st.warning("Brak danych dla wybranego zakresu dat.")
@@ -1004,12 +1175,7 @@ def plot_comparison_chart(
     comparison_df = filtered_prices.copy()
     
     # Obliczamy indeks ceny (pierwszy dzień = 100)
-    metals = {
-        'Gold': 'Złoto',
-        'Silver': 'Srebro',
-        'Platinum': 'Platyna',
-        'Palladium': 'Pallad'
-    }
+    metals = METAL_NAMES_PL
     
     for metal in metals.keys():
         if metal in comparison_df.columns:
@@ -1024,9 +1190,9 @@ def plot_comparison_chart(
     for metal_eng, metal_pl in metals.items():
         index_column = f"{metal_eng}_Index"
         if index_column in comparison_df.columns:
-            fig.add_trace(go.Scatter(
+            fig.add_trace(go.Scattergl(
                 x=comparison_df['Data'],
-                y=comparison_df[index_column],
+                y=_plot_values(comparison_df[index_column]),
                 mode='lines',
                 name=metal_pl,
                 line=dict(color=METAL_COLORS.get(metal_eng, '#808080'), width=2),
@@ -1069,19 +1235,20 @@ def plot_cumulative_investment(schedule_df: pd.DataFrame, currency: str = 'EUR')
         st.warning("Brak danych do wyświetlenia wykresu inwestycji.")
         return
     
-    # Sortujemy po dacie
-    schedule_df = schedule_df.sort_values('Data')
-    
-    # Obliczamy skumulowaną sumę
-    schedule_df['Skumulowana kwota'] = schedule_df['Kwota'].cumsum()
+    # Daty i kwoty jako tablice posortowane po dacie oraz suma narastająca
+    # (bez kopii DataFrame i dopisywania do niej kolumny)
+    order = np.argsort(schedule_df['Data'].to_numpy(), kind='stable')
+    dates = schedule_df['Data'].to_numpy()[order]
+    amounts = schedule_df['Kwota'].to_numpy(dtype=float)[order]
+    cumulative_amounts = np.cumsum(amounts)
     
     # Tworzymy wykres
     fig = go.Figure()
     
     # Dodajemy linie
-    fig.add_trace(go.Scatter(
-        x=schedule_df['Data'],
-        y=schedule_df['Skumulowana kwota'],
+    fig.add_trace(go.Scattergl(
+        x=dates,
+        y=cumulative_amounts,
         mode='lines',
         name='Skumulowana inwestycja',
         line=dict(color='#0891b2', width=3),
@@ -1092,8 +1259,8 @@ def plot_cumulative_investment(schedule_df: pd.DataFrame, currency: str = 'EUR')
     
     # Dodajemy słupki pojedynczych inwestycji
     fig.add_trace(go.Bar(
-        x=schedule_df['Data'],
-        y=schedule_df['Kwota'],
+        x=dates,
+        y=amounts,
         name='Pojedyncze wpłaty',
         marker_color='#0e7490',
         hovertemplate='%{x|%d.%m.%Y}<br>Wpłata: %{y:,.2f} ' + currency
@@ -1193,13 +1360,12 @@ def main():
     if 'selected_unit' not in st.session_state:
         st.session_state.selected_unit = DEFAULT_UNIT
 
-    # Funkcja do ładowania danych
-    @st.cache_data
+    # Funkcja do ładowania danych (cache w loaderach, kluczowany czasem modyfikacji pliku)
     def load_data():
         try:
-            metal_prices = load_metal_prices("data/metal_prices.csv")
-            exchange_rates = load_exchange_rates("data/exchange_rates.csv")
-            inflation_rates = load_inflation_rates("data/inflation_rates_ready.csv")
+            metal_prices = load_metal_prices("data/metal_prices.csv", _file_mtime("data/metal_prices.csv"))
+            exchange_rates = load_exchange_rates("data/exchange_rates.csv", _file_mtime("data/exchange_rates.csv"))
+            inflation_rates = load_inflation_rates("data/inflation_rates_ready.csv", _file_mtime("data/inflation_rates_ready.csv"))
             return metal_prices, exchange_rates, inflation_rates, None
         except Exception as e:
             return None, None, None, str(e)
@@ -1225,22 +1391,22 @@ def main():
         st.header(translate("simulation_settings", language=st.session_state.language))
         
         # Karty w panelu bocznym
+        tab_labels = translate_many(
+            ("general_settings", "allocation_settings", "recurring_purchase_settings", "storage_cost_settings"),
+            language=st.session_state.language
+        )
         tab1, tab2, tab3, tab4 = st.tabs([
-            "⚙️ " + translate("general_settings", language=st.session_state.language),
-            "📊 " + translate("allocation_settings", language=st.session_state.language),
-            "🔄 " + translate("recurring_purchase_settings", language=st.session_state.language),
-            "💼 " + translate("storage_cost_settings", language=st.session_state.language)
+            icon + " " + label for icon, label in zip(("⚙️", "📊", "🔄", "💼"), tab_labels)
         ])
         
         # Karta 1: Ustawienia ogólne
         with tab1:
-            selected_language_label = st.selectbox(
+            st.session_state.language = st.selectbox(
                 translate("choose_language", language=st.session_state.language),
-                options=[LANGUAGE_LABELS[code] for code in AVAILABLE_LANGUAGES],
-                index=AVAILABLE_LANGUAGES.index(st.session_state.language)
+                options=AVAILABLE_LANGUAGES,
+                index=AVAILABLE_LANGUAGES.index(st.session_state.language),
+                format_func=LANGUAGE_LABELS.get
             )
-            selected_language = [code for code, label in LANGUAGE_LABELS.items() if label == selected_language_label][0]
-            st.session_state.language = selected_language
 
             st.session_state.selected_currency = st.selectbox(
                 translate("choose_currency", language=st.session_state.language),
@@ -1252,7 +1418,7 @@ def main():
                 translate("choose_unit", language=st.session_state.language),
                 options=AVAILABLE_UNITS,
                 index=AVAILABLE_UNITS.index(st.session_state.selected_unit),
-                format_func=lambda x: {"g": "Gramy (g)", "oz": "Uncje (oz)"}.get(x, x)
+                format_func=lambda x: UNIT_LABELS.get(x, x)
             )
             
             st.session_state.start_amount = st.number_input(
@@ -1370,12 +1536,7 @@ def main():
                 label=translate("frequency", language=st.session_state.language),
                 options=["one_time", "weekly", "monthly", "quarterly"],
                 index=["one_time", "weekly", "monthly", "quarterly"].index(st.session_state.frequency),
-                format_func=lambda x: {
-                    "one_time": translate("one_time", language=st.session_state.language),
-                    "weekly": translate("weekly", language=st.session_state.language),
-                    "monthly": translate("monthly", language=st.session_state.language),
-                    "quarterly": translate("quarterly", language=st.session_state.language)
-                }.get(x, x)
+                format_func=lambda x: translate(x, language=st.session_state.language)
             )
             
             if st.session_state.frequency != "one_time":
@@ -1392,13 +1553,7 @@ def main():
                         translate("purchase_day_weekly", language=st.session_state.language),
                         options=list(range(0, 5)),
                         index=st.session_state.purchase_day,
-                        format_func=lambda x: {
-                            0: "Poniedziałek",
-                            1: "Wtorek",
-                            2: "Środa",
-                            3: "Czwartek",
-                            4: "Piątek"
-                        }.get(x, x)
+                        format_func=lambda x: WEEKDAY_LABELS.get(x, x)
                     )
                 elif st.session_state.frequency == "monthly":
                     st.session_state.purchase_day = st.selectbox(
@@ -1419,20 +1574,14 @@ def main():
                 translate("storage_base", language=st.session_state.language),
                 options=["value", "invested_amount"],
                 index=["value", "invested_amount"].index(st.session_state.storage_base),
-                format_func=lambda x: {
-                    "value": "Wartość metali",
-                    "invested_amount": "Zainwestowana kwota"
-                }.get(x, x)
+                format_func=lambda x: STORAGE_BASE_LABELS.get(x, x)
             )
             
             st.session_state.storage_frequency = st.selectbox(
                 translate("storage_frequency", language=st.session_state.language),
                 options=["monthly", "yearly"],
                 index=["monthly", "yearly"].index(st.session_state.storage_frequency),
-                format_func=lambda x: {
-                    "monthly": "Miesięczna",
-                    "yearly": "Roczna"
-                }.get(x, x)
+                format_func=lambda x: STORAGE_FREQUENCY_LABELS.get(x, x)
             )
             
             st.session_state.storage_rate = st.number_input(
@@ -1456,14 +1605,7 @@ def main():
                 translate("cover_method", language=st.session_state.language),
                 options=["cash", "gold", "silver", "platinum", "palladium", "all_metals"],
                 index=["cash", "gold", "silver", "platinum", "palladium", "all_metals"].index(st.session_state.cover_method),
-                format_func=lambda x: {
-                    "cash": translate("cash", language=st.session_state.language),
-                    "gold": translate("gold", language=st.session_state.language),
-                    "silver": translate("silver", language=st.session_state.language),
-                    "platinum": translate("platinum", language=st.session_state.language),
-                    "palladium": translate("palladium", language=st.session_state.language),
-                    "all_metals": translate("all_metals", language=st.session_state.language)
-                }.get(x, x)
+                format_func=lambda x: translate(x, language=st.session_state.language)
             )
         
         # Przycisk uruchomienia symulacji
@@ -1550,10 +1692,13 @@ def main():
         # Karty z głównymi metrykami
         kol1, kol2, kol3, kol4 = st.columns(4)
         
-        # Wartość portfela
+        # Wartość portfela (iloczyn skalarny ilości i cen zamiast tymczasowej serii)
         total_value = 0
         if not results['portfolio'].empty:
-            total_value = (results['portfolio']['Ilość'] * results['portfolio']['Cena jednostkowa']).sum()
+            total_value = float(np.dot(
+                results['portfolio']['Ilość'].to_numpy(dtype=float),
+                results['portfolio']['Cena jednostkowa'].to_numpy(dtype=float)
+            ))
         
         # Całkowita zainwestowana kwota
         total_invested = results['schedule']['Kwota'].sum() if not results['schedule'].empty else 0
@@ -1711,14 +1856,14 @@ def main():
                 # Pobierz ostatnie ceny metali
                 latest_prices = results['metal_prices'].iloc[-1]
                 
-                # Dodaj kolumny
-                for idx, row in summary_with_price.iterrows():
-                    metal = row['Metal'].lower()
-                    if metal in ['gold', 'silver', 'platinum', 'palladium']:
-                        price_column = f"{metal.capitalize()}"
-                        if price_column in latest_prices:
-                            summary_with_price.at[idx, 'Aktualna cena'] = latest_prices[price_column]
-                            summary_with_price.at[idx, 'Wartość aktualna'] = row['Ilość'] * latest_prices[price_column]
+                # Dodaj kolumny (ceny dopasowane do metali jednym mapowaniem nazw)
+                price_columns = summary_with_price['Metal'].astype(str).str.lower().map(METAL_CANONICAL)
+                current_prices = pd.to_numeric(price_columns.map(latest_prices), errors='coerce')
+                if current_prices.notna().any():
+                    summary_with_price['Aktualna cena'] = current_prices
+                    summary_with_price['Wartość aktualna'] = (summary_with_price['Ilość'] * current_prices).where(
+                        current_prices.notna(), summary_with_price['Wartość aktualna']
+                    )
                 
                 st.dataframe(
                     summary_with_price,
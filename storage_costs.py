@@ -18,8 +18,6 @@ def calculate_storage_costs(df_portfolio: pd.DataFrame, storage_fee_rate: float
         DataFrame z aktualizowanym portfelem.
     """
 
-    df = df_portfolio.copy()
-
     # Ustalenie podstawy naliczania kosztu
     if storage_base == "value":
         base_column = "Kwota"
@@ -34,48 +32,45 @@ def calculate_storage_costs(df_portfolio: pd.DataFrame, storage_fee_rate: float
 
     vat_multiplier = 1 + vat_rate / 100
 
-    # Grupa po dacie
-    grouped = df.groupby('Data')
-
-    results = []
-
-    for date, group in grouped:
-        period_cost_net = group[base_column].sum() * period_rate
-        period_cost_gross = period_cost_net * vat_multiplier
-
-        group = group.copy()
-        group['Koszt_magazynowania'] = 0.0
-        group['Kwota_po_kosztach'] = group[base_column]
-
-        if cover_method == "cash":
-            # Koszt pokrywany gotówką – bez zmiany metali
-            group['Koszt_magazynowania'] = period_cost_gross / len(group)
-            group['Kwota_po_kosztach'] = group[base_column] - group['Koszt_magazynowania']
-
-        elif cover_method in ["gold", "silver", "platinum", "palladium"]:
-            selected = group[group['Metal'] == cover_method.capitalize()]
-            if not selected.empty:
-                metal_price = selected.iloc[0]['Cena jednostkowa']
-                grams_to_sell = period_cost_gross / metal_price
-                group.loc[group['Metal'] == cover_method.capitalize(), 'Ilość'] -= grams_to_sell
-                group['Koszt_magazynowania'] = period_cost_gross / len(group)
-                group['Kwota_po_kosztach'] = group['Ilość'] * group['Cena jednostkowa']
-
-        elif cover_method == "all_metals":
-            total_value = group[base_column].sum()
-            for idx, row in group.iterrows():
-                share = row[base_column] / total_value if total_value > 0 else 0
-                metal_share_cost = period_cost_gross * share
-                metal_price = row['Cena jednostkowa']
-                grams_to_sell = metal_share_cost / metal_price
-                group.at[idx, 'Ilość'] -= grams_to_sell
-                group.at[idx, 'Koszt_magazynowania'] = metal_share_cost
-                group.at[idx, 'Kwota_po_kosztach'] = group.at[idx, 'Ilość'] * metal_price
-
-        results.append(group)
-
-    final_df = pd.concat(results)
-    return final_df
+    # Każda data jest rozliczana niezależnie od pozostałych, więc wszystkie okresy
+    # liczymy naraz na kolumnach (kolejność wierszy jak przy iteracji po grupach dat)
+    dated = df_portfolio['Data'].notna()
+    if not dated.any():
+        return df_portfolio.copy()
+    df = df_portfolio[dated].sort_values('Data', kind='stable')
+
+    by_date = df.groupby('Data')
+    base = df[base_column]
+    period_total = by_date[base_column].transform('sum')
+    period_cost_gross = period_total * period_rate * vat_multiplier
+    rows_per_date = by_date[base_column].transform('size')
+
+    df['Koszt_magazynowania'] = 0.0
+    df['Kwota_po_kosztach'] = base
+
+    if cover_method == "cash":
+        # Koszt pokrywany gotówką – bez zmiany metali
+        df['Koszt_magazynowania'] = period_cost_gross / rows_per_date
+        df['Kwota_po_kosztach'] = base - df['Koszt_magazynowania']
+
+    elif cover_method in ["gold", "silver", "platinum", "palladium"]:
+        # Sprzedajemy wybrany metal po cenie z pierwszego wiersza danej daty
+        selected = df['Metal'] == cover_method.capitalize()
+        has_selected = selected.groupby(df['Data']).transform('any')
+        metal_price = df['Cena jednostkowa'].where(selected).groupby(df['Data']).transform('first')
+        df.loc[selected, 'Ilość'] -= (period_cost_gross / metal_price)[selected]
+        df['Koszt_magazynowania'] = (period_cost_gross / rows_per_date).where(has_selected, 0.0)
+        df['Kwota_po_kosztach'] = (df['Ilość'] * df['Cena jednostkowa']).where(has_selected, base)
+
+    elif cover_method == "all_metals":
+        # Koszt rozkładany proporcjonalnie do udziału każdego wiersza w danej dacie
+        share = (base / period_total).where(period_total > 0, 0.0)
+        metal_share_cost = period_cost_gross * share
+        df['Ilość'] = df['Ilość'] - metal_share_cost / df['Cena jednostkowa']
+        df['Koszt_magazynowania'] = metal_share_cost
+        df['Kwota_po_kosztach'] = df['Ilość'] * df['Cena jednostkowa']
+
+    return df
 
 def total_storage_cost(df_portfolio: pd.DataFrame) -> float:
     """
@@ -0,0 +1,27 @@
+import base64
+import re
+from io import BytesIO
+
+import pandas as pd
+import pytest
+
+prometalle = pytest.importorskip("prometalle")
+pytest.importorskip("openpyxl")
+
+
+def _read_back(href):
+    payload = re.search(r"base64,([^\"]+)", href).group(1)
+    return pd.read_excel(BytesIO(base64.b64decode(payload)), sheet_name=None, engine="openpyxl")
+
+
+def test_excel_export_round_trip():
+    frames = {
+        "Dane": pd.DataFrame({"a": [1, 2, 3], "b": [4.5, 5.5, 6.5], "c": ["x", "y", "z"]}),
+        "Druga": pd.DataFrame({"Data": pd.date_range("2020-01-01", periods=3), "Wartość": [1.0, 2.0, 3.0]}),
+    }
+
+    sheets = _read_back(prometalle.create_excel_download_link(frames))
+
+    assert list(sheets) == list(frames)
+    for name, expected in frames.items():
+        pd.testing.assert_frame_equal(sheets[name], expected, check_dtype=False)
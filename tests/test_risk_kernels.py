@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+
+import kernels
+
+
+def _series_with_gaps(seed, size=250, gaps=20, leading_nan=False):
+    rng = np.random.default_rng(seed)
+    values = 100 * np.cumprod(1 + rng.normal(0, 0.02, size))
+    values[rng.choice(size, gaps, replace=False)] = np.nan
+    if leading_nan:
+        values[:3] = np.nan
+    return values
+
+
+@pytest.mark.parametrize("leading_nan", [False, True])
+@pytest.mark.parametrize("seed", range(5))
+def test_numpy_and_loop_kernels_agree_on_nan_gaps(seed, leading_nan):
+    values = _series_with_gaps(seed, leading_nan=leading_nan)
+
+    expected = kernels.risk_stats_numpy(values)
+    np.testing.assert_allclose(kernels.risk_stats_loop(values), expected, rtol=1e-9)
+    np.testing.assert_allclose(kernels.risk_kernel(values), expected, rtol=1e-9)
+
+
+def test_max_drawdown_skips_nan():
+    values = np.array([1.0, 2.0, np.nan, 3.0, 1.0])
+
+    for kernel in (kernels.risk_stats_numpy, kernels.risk_stats_loop, kernels.risk_kernel):
+        assert kernel(values)[1] == pytest.approx(200 / 3)
@@ -1,8 +1,12 @@
 # /main/translation.py
 
+from functools import lru_cache
+from types import MappingProxyType
+
 from config import DEFAULT_LANGUAGE
 
-TRANSLATIONS = {
+# Słownik tłumaczeń (niemodyfikowalny - współdzielony bezpiecznie między sesjami)
+TRANSLATIONS = MappingProxyType({
     "choose_language": {
         "pl": "Wybierz język",
         "en": "Choose language",
@@ -209,8 +213,15 @@ TRANSLATIONS = {
         "de": "Transaktionsregister"
     }
     
-}
+})
+
+# Tłumaczenia odwrócone do płaskich słowników per język (jedno wyszukiwanie zamiast dwóch)
+TRANSLATIONS_BY_LANGUAGE = MappingProxyType({
+    language: MappingProxyType({key: texts[language] for key, texts in TRANSLATIONS.items() if language in texts})
+    for language in dict.fromkeys(language for texts in TRANSLATIONS.values() for language in texts)
+})
 
+@lru_cache(maxsize=512)
 def translate(key: str, language: str = DEFAULT_LANGUAGE) -> str:
-    """Zwraca tłumaczenie danego klucza w wybranym języku."""
-    return TRANSLATIONS.get(key, {}).get(language, key)
+    """Zwraca tłumaczenie danego klucza w wybranym języku (wyniki są zapamiętywane)."""
+    return TRANSLATIONS_BY_LANGUAGE.get(language, {}).get(key, key)
@@ -8,6 +8,8 @@ import plotly.graph_objects as go
 import plotly.express as px
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Tuple, Optional
+from modules.data_utils import filter_date_range
+from charts import plot_values, portfolio_value_by_date
 
 # Konfiguracja kolorów dla metali
 METAL_COLORS = {
@@ -25,6 +27,22 @@ METAL_COLORS = {
     'Pallad': '#8A8B8C'
 }
 
+# Polskie nazwy metali dla wykresów i odwrotne mapowanie (budowane raz, a nie przy każdym renderze)
+METAL_NAMES_PL = {
+    'Gold': 'Złoto',
+    'Silver': 'Srebro',
+    'Platinum': 'Platyna',
+    'Palladium': 'Pallad'
+}
+METAL_BY_NAME_PL = {name: metal for metal, name in METAL_NAMES_PL.items()}
+
+# Historyczne wydarzenia na wykresach (daty parsowane raz, przy imporcie; można dodać więcej)
+HISTORICAL_EVENTS = {
+    pd.Timestamp('2008-09-15'): 'Upadek Lehman Brothers',
+    pd.Timestamp('2011-08-22'): 'Szczyt ceny złota',
+    pd.Timestamp('2020-03-23'): 'Krach COVID-19'
+}
+
 def plot_portfolio_value(df_portfolio: pd.DataFrame, currency: str = 'EUR'):
     """
     Rysuje interaktywny wykres wartości portfela w czasie.
@@ -37,19 +55,14 @@ def plot_portfolio_value(df_portfolio: pd.DataFrame, currency: str = 'EUR'):
         st.warning("Brak danych do wyświetlenia wykresu.")
         return
 
-    # Obliczamy wartość depozytu: ilość * aktualna cena metalu
-    df_portfolio['Wartość'] = df_portfolio['Ilość'] * df_portfolio['Cena jednostkowa']
-
-    # Grupujemy po dacie i sumujemy wartość depozytu
-    df_by_date = df_portfolio.groupby('Data').agg({
-        'Wartość': 'sum'
-    }).reset_index()
+    # Wartość depozytu zsumowana dla każdej daty
+    df_by_date = portfolio_value_by_date(df_portfolio, 'Wartość').reset_index()
 
     # Dodajemy wykres wartości skumulowanej
     fig = go.Figure()
     
     # Dodajemy linię wartości portfela
-    fig.add_trace(go.Scatter(
+    fig.add_trace(go.Scattergl(
         x=df_by_date['Data'],
         y=df_by_date['Wartość'],
         mode='lines+markers',
@@ -78,17 +91,14 @@ def plot_portfolio_value(df_portfolio: pd.DataFrame, currency: str = 'EUR'):
     )
     
     # Dodajemy pionowe linie dla ważnych momentów - np. krach
-    # Można dodać więcej oznaczonych dat, jeśli potrzeba
-    important_dates = {
-        '2008-09-15': 'Upadek Lehman Brothers',
-        '2011-08-22': 'Szczyt ceny złota',
-        '2020-03-23': 'Krach COVID-19'
-    }
-    
-    for date_str, label in important_dates.items():
+    # Zakres dat wykresu liczymy raz (wartości są posortowane po dacie); gdy brak dat
+    # (np. same NaT), zostaje NaT jak przy min()/max() i żadna linia nie jest dodawana
+    first_date = last_date = pd.NaT
+    if not df_by_date.empty:
+        first_date, last_date = df_by_date['Data'].iloc[0], df_by_date['Data'].iloc[-1]
+    for date, label in HISTORICAL_EVENTS.items():
         try:
-            date = pd.to_datetime(date_str)
-            if date >= df_by_date['Data'].min() and date <= df_by_date['Data'].max():
+            if first_date <= date <= last_date:
                 fig.add_vline(
                     x=date, 
                     line_width=1, 
@@ -204,10 +214,7 @@ def plot_price_history(
     end_date = pd.to_datetime(end_date)
     
     # Filtrujemy dane w zakresie dat
-    filtered_prices = metal_prices[
-        (metal_prices['Data'] >= start_date) & 
-        (metal_prices['Data'] <= end_date)
-    ]
+    filtered_prices = filter_date_range(metal_prices, start_date, end_date)
     
     if filtered_prices.empty:
         st.warning("Brak danych dla wybranego zakresu dat.")
@@ -217,12 +224,7 @@ def plot_price_history(
     fig = go.Figure()
     
     # Dodajemy linie dla każdego metalu
-    metals = {
-        'Gold': 'Złoto',
-        'Silver': 'Srebro',
-        'Platinum': 'Platyna',
-        'Palladium': 'Pallad'
-    }
+    metals = METAL_NAMES_PL
     
     # Dodajemy przełączniki dla metali
     metal_options = st.multiselect(
@@ -233,8 +235,7 @@ def plot_price_history(
     )
     
     # Mapujemy nazwy polskie na angielskie
-    reverse_metals = {v: k for k, v in metals.items()}
-    selected_metals = [reverse_metals[m] for m in metal_options]
+    selected_metals = [METAL_BY_NAME_PL[m] for m in metal_options]
     
     # Jeśli nic nie wybrano, pokazujemy wszystkie
     if not selected_metals:
@@ -245,9 +246,9 @@ def plot_price_history(
         if metal_eng in selected_metals:
             metal_column = f"{metal_eng}"
             if metal_column in filtered_prices.columns:
-                fig.add_trace(go.Scatter(
+                fig.add_trace(go.Scattergl(
                     x=filtered_prices['Data'],
-                    y=filtered_prices[metal_column],
+                    y=plot_values(filtered_prices[metal_column]),
                     mode='lines',
                     name=metal_pl,
                     line=dict(color=METAL_COLORS.get(metal_eng, '#808080'), width=2),
@@ -275,32 +276,29 @@ def plot_price_history(
     st.plotly_chart(fig, use_container_width=True)
     
     # Dodajemy statystyki pod wykresem w formie tabeli
-    if not filtered_prices.empty:
-        stats_data = []
-        
-        for metal_eng, metal_pl in metals.items():
-            if metal_eng in selected_metals:
-                metal_column = f"{metal_eng}"
-                if metal_column in filtered_prices.columns:
-                    first_price = filtered_prices[metal_column].iloc[0]
-                    last_price = filtered_prices[metal_column].iloc[-1]
-                    min_price = filtered_prices[metal_column].min()
-                    max_price = filtered_prices[metal_column].max()
-                    change_value = last_price - first_price
-                    change_percent = (change_value / first_price * 100) if first_price > 0 else 0
-                    
-                    stats_data.append({
-                        "Metal": metal_pl,
-                        "Cena początkowa": f"{first_price:.2f} {currency}",
-                        "Cena końcowa": f"{last_price:.2f} {currency}",
-                        "Zmiana %": f"{change_percent:+.2f}%",
-                        "Minimum": f"{min_price:.2f} {currency}",
-                        "Maksimum": f"{max_price:.2f} {currency}",
-                    })
-        
-        if stats_data:
-            stats_df = pd.DataFrame(stats_data)
-            st.dataframe(stats_df, hide_index=True, use_container_width=True)
+    stats_metals = [
+        metal_eng for metal_eng in metals
+        if metal_eng in selected_metals and metal_eng in filtered_prices.columns
+    ]
+    if not filtered_prices.empty and stats_metals:
+        # Statystyki wszystkich metali naraz z macierzy cen (daty x metale)
+        prices = filtered_prices[stats_metals]
+        first_prices = prices.iloc[0].to_numpy(dtype=float)
+        last_prices = prices.iloc[-1].to_numpy(dtype=float)
+        min_prices = prices.min().to_numpy(dtype=float)
+        max_prices = prices.max().to_numpy(dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            change_percents = np.where(first_prices > 0, (last_prices - first_prices) / first_prices * 100, 0.0)
+
+        stats_df = pd.DataFrame({
+            "Metal": [metals[metal_eng] for metal_eng in stats_metals],
+            "Cena początkowa": [f"{price:.2f} {currency}" for price in first_prices],
+            "Cena końcowa": [f"{price:.2f} {currency}" for price in last_prices],
+            "Zmiana %": [f"{change:+.2f}%" for change in change_percents],
+            "Minimum": [f"{price:.2f} {currency}" for price in min_prices],
+            "Maksimum": [f"{price:.2f} {currency}" for price in max_prices],
+        })
+        st.dataframe(stats_df, hide_index=True, use_container_width=True)
 
 
 def plot_comparison_chart(
@@ -327,10 +325,7 @@ def plot_comparison_chart(
     end_date = pd.to_datetime(end_date)
     
     # Filtrujemy dane w zakresie dat
-    filtered_prices = metal_prices[
-        (metal_prices['Data'] >= start_date) & 
-        (metal_prices['Data'] <= end_date)
-    ]
+    filtered_prices = filter_date_range(metal_prices, start_date, end_date)
     
     if filtered_prices.empty:
         st.warning("Brak danych dla wybranego zakresu dat.")
@@ -340,12 +335,7 @@ def plot_comparison_chart(
     comparison_df = filtered_prices.copy()
     
     # Obliczamy indeks ceny (pierwszy dzień = 100)
-    metals = {
-        'Gold': 'Złoto',
-        'Silver': 'Srebro',
-        'Platinum': 'Platyna',
-        'Palladium': 'Pallad'
-    }
+    metals = METAL_NAMES_PL
     
     for metal in metals.keys():
         metal_column = f"{metal}"
@@ -361,9 +351,9 @@ def plot_comparison_chart(
     for metal_eng, metal_pl in metals.items():
         index_column = f"{metal_eng}_Index"
         if index_column in comparison_df.columns:
-            fig.add_trace(go.Scatter(
+            fig.add_trace(go.Scattergl(
                 x=comparison_df['Data'],
-                y=comparison_df[index_column],
+                y=plot_values(comparison_df[index_column]),
                 mode='lines',
                 name=metal_pl,
                 line=dict(color=METAL_COLORS.get(metal_eng, '#808080'), width=2),
@@ -413,19 +403,20 @@ def plot_cumulative_investment(schedule_df: pd.DataFrame, currency: str = 'EUR')
         st.warning("Brak danych do wyświetlenia wykresu inwestycji.")
         return
     
-    # Sortujemy po dacie
-    schedule_df = schedule_df.sort_values('Data')
-    
-    # Obliczamy skumulowaną sumę
-    schedule_df['Skumulowana kwota'] = schedule_df['Kwota'].cumsum()
+    # Daty i kwoty jako tablice posortowane po dacie oraz suma narastająca
+    # (bez kopii DataFrame i dopisywania do niej kolumny)
+    order = np.argsort(schedule_df['Data'].to_numpy(), kind='stable')
+    dates = schedule_df['Data'].to_numpy()[order]
+    amounts = schedule_df['Kwota'].to_numpy(dtype=float)[order]
+    cumulative_amounts = np.cumsum(amounts)
     
     # Tworzymy wykres
     fig = go.Figure()
     
     # Dodajemy linie
-    fig.add_trace(go.Scatter(
-        x=schedule_df['Data'],
-        y=schedule_df['Skumulowana kwota'],
+    fig.add_trace(go.Scattergl(
+        x=dates,
+        y=cumulative_amounts,
         mode='lines',
         name='Skumulowana inwestycja',
         line=dict(color='#0891b2', width=3),
@@ -436,8 +427,8 @@ def plot_cumulative_investment(schedule_df: pd.DataFrame, currency: str = 'EUR')
     
     # Dodajemy słupki pojedynczych inwestycji
     fig.add_trace(go.Bar(
-        x=schedule_df['Data'],
-        y=schedule_df['Kwota'],
+        x=dates,
+        y=amounts,
         name='Pojedyncze wpłaty',
         marker_color='#0e7490',
         hovertemplate='%{x|%d.%m.%Y}<br>Wpłata: %{y:,.2f} ' + currency
@@ -505,7 +496,7 @@ def plot_cost_breakdown(portfolio_df: pd.DataFrame, currency: str = 'EUR') -> No
         return
     
     # Grupujemy po dacie i metalu
-    costs_by_date_metal = portfolio_df.groupby(['Data', 'Metal'])['Koszt_magazynowania'].sum().reset_index()
+    costs_by_date_metal = portfolio_df.groupby(['Data', 'Metal'], observed=True)['Koszt_magazynowania'].sum().reset_index()
     
     # Tworzymy wykres
     fig = px.bar(